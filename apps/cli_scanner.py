@@ -97,6 +97,11 @@ def main():
         default=4,
         help='Количество потоков для параллельного сканирования (по умолчанию: 4)'
     )
+    parser.add_argument(
+        '--processes',
+        action='store_true',
+        help='Сканировать большие папки в пуле процессов (каждый процесс получает копию базы)'
+    )
     parser.add_argument(
         '--verbose', '-v',
         action='store_true',
@@ -157,7 +162,7 @@ def main():
         
         # 2. Запусти сканирование
         print(f"\n🔍 Сканирование папки: {args.folder}")
-        scanner = FolderScanner(tree, max_workers=args.workers)
+        scanner = FolderScanner(tree, max_workers=args.workers, use_processes=args.processes)
         
         start_time = time.time()
         
@@ -24,6 +24,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from src.parsers import DataLoader
 from src.scanner import FolderScanner, FileScanner, RegistryScanner
 from src.scanner.file_scanner import VulnerabilityFinding
+from src.detectors.file_analyzer import FileAnalyzer
 from src.detectors.system_scanner import SystemScanner
 from src.reports import ReportGenerator
 
@@ -150,9 +151,9 @@ class ScanWorker(QObject):
             for idx, pkg in enumerate(packages, 1):
                 self.progress_callback(idx, total)
                 
-                pkg_name = pkg['name']
-                pkg_version = pkg['version']
-                install_path = pkg.get('install_path', f'/usr/bin/{pkg_name}')
+                pkg_name = pkg.name
+                pkg_version = pkg.version
+                install_path = pkg.install_path
                 
                 vulnerabilities = self.tree.find_vulnerabilities(pkg_name, pkg_version)
                 
@@ -236,7 +237,7 @@ class ScanWorker(QObject):
                     continue
                 
                 # Найди все .exe файлы
-                exe_files = list(folder_path.rglob('*.exe'))
+                exe_files = [Path(entry.path) for entry in FileAnalyzer.iter_file_entries(str(folder_path), ('.exe',))]
                 total = len(exe_files)
                 
                 for i, exe_file in enumerate(exe_files):
@@ -296,9 +297,9 @@ class ScanWorker(QObject):
             for idx, pkg in enumerate(packages, 1):
                 self.progress_callback(idx, total)
                 
-                pkg_name = pkg['name']
-                pkg_version = pkg['version']
-                install_path = pkg.get('install_path', f'/usr/bin/{pkg_name}')
+                pkg_name = pkg.name
+                pkg_version = pkg.version
+                install_path = pkg.install_path
                 
                 vulnerabilities = self.tree.find_vulnerabilities(pkg_name, pkg_version)
                 
@@ -3,14 +3,16 @@
 Интерактивный сканер уязвимостей с выбором режима сканирования
 """
 
+import os
 import sys
 import time
 import io
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 
 # Установи правильную кодировку для консоли
 if sys.platform == 'win32':
-    import os
     os.environ['PYTHONIOENCODING'] = 'utf-8'
     # Перенаправь stdout в UTF-8
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
@@ -21,6 +23,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.parsers import DataLoader
 from src.scanner import FolderScanner, FileScanner, RegistryScanner
+from src.scanner.file_scanner import init_worker_scanner, scan_file_in_worker
+from src.detectors.file_analyzer import FileAnalyzer
 from src.detectors.system_scanner import SystemScanner
 from src.reports import ReportGenerator
 
@@ -188,6 +192,52 @@ def get_output_names():
     return json_output, html_output
 
 
+# Заголовок блока соответствия реестр -> .exe
+REGISTRY_EXE_MAPPING_HEADER = "\n".join([
+    "",
+    "="*70,
+    "📋 СООТВЕТСТВИЕ: ПРОГРАММЫ ИЗ РЕЕСТРА → НАЙДЕННЫЕ .EXE ФАЙЛЫ",
+    "="*70,
+])
+
+
+# Пул процессов для .exe запускается только для папок от этого размера: каждый процесс
+# получает копию дерева (~1.5 с на сериализацию и ~1.8 с на загрузку полной БДУ),
+# а сканирование одного файла в текущем процессе занимает доли миллисекунды
+PROCESS_POOL_MIN_EXE_FILES = 10000
+
+
+def print_registry_exe_mapping(registry_to_exe_map, total_programs):
+    """
+    Показать соответствие программ из реестра найденным .exe файлам
+    Весь блок собирается в список строк и выводится одной записью в stdout
+    """
+    lines = [REGISTRY_EXE_MAPPING_HEADER]
+    
+    matched_programs = sum(1 for exe_list in registry_to_exe_map.values() if exe_list)
+    # Сортируются только программы, для которых есть что показать
+    for prog_name, exe_list in sorted((p, e) for p, e in registry_to_exe_map.items() if e):
+        lines.append(f"\n✅ {prog_name}")
+        for exe_path in exe_list[:3]:  # Показать первые 3 .exe
+            lines.append(f"   → {exe_path}")
+        if len(exe_list) > 3:
+            lines.append(f"   ... и ещё {len(exe_list) - 3} файлов")
+    
+    # Программы из реестра без найденных .exe
+    unmatched_programs = total_programs - matched_programs
+    if unmatched_programs > 0:
+        lines.append(f"\n⚠️  Программ из реестра без найденных .exe: {unmatched_programs}")
+    
+    match_percent = matched_programs / total_programs * 100 if total_programs else 0.0
+    lines.append(f"\n📊 ИТОГОВАЯ СТАТИСТИКА СООТВЕТСТВИЯ:")
+    lines.append(f"   • Программ из реестра: {total_programs}")
+    lines.append(f"   • Нашли .exe для программ: {matched_programs}")
+    lines.append(f"   • Процент соответствия: {match_percent:.1f}%")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
+
 def scan_file(file_path, tree, report_gen):
     """Сканировать один файл"""
     print(f"\n🔍 Анализ файла: {file_path}")
@@ -260,6 +310,41 @@ def scan_folder(folder_path, tree, report_gen, all_scanned_files):
     return findings
 
 
+def scan_exe_files(executor, exe_files, tree):
+    """
+    Сканировать .exe файлы в общем пуле процессов или в текущем процессе
+    Если пул сломан (процесс-воркер аварийно завершился), оставшиеся файлы
+    сканируются в текущем процессе - результаты папки не теряются
+    
+    Args:
+        executor: ProcessPoolExecutor с initializer=init_worker_scanner
+            или None - сканировать в текущем процессе
+        exe_files: Список путей к .exe файлам
+        tree: Дерево уязвимостей (для сканирования без пула)
+        
+    Yields:
+        VulnerabilityFinding или None для каждого файла в порядке exe_files
+    """
+    done = 0
+    if executor is not None:
+        try:
+            for finding in executor.map(scan_file_in_worker,
+                                        [str(exe_file) for exe_file in exe_files],
+                                        chunksize=32):
+                yield finding
+                done += 1
+            return
+        except BrokenProcessPool:
+            print("\n   ⚠️  Пул процессов недоступен, сканирование продолжается в текущем процессе")
+    
+    scanner = FileScanner(tree)
+    for exe_file in exe_files[done:]:
+        try:
+            yield scanner.scan_file(str(exe_file))
+        except Exception:
+            yield None
+
+
 def scan_system(tree, report_gen):
     """Сканировать все стандартные системные папки (только .exe файлы для Windows) + реестр"""
     print("\n🔍 Полное системное сканирование...")
@@ -344,74 +429,88 @@ def scan_system(tree, report_gen):
     print(f"\n📁 Папки для сканирования: {', '.join(folders_to_scan)}")
     
     total_findings = []
-    file_scanner = FileScanner(tree)
     
-    for folder in folders_to_scan:
-        folder_path = Path(folder)
-        if not folder_path.exists():
-            print(f"⚠️  Папка не найдена: {folder}")
-            continue
+    # Анализ .exe (PE-метаданные, регулярные выражения) нагружает CPU, поэтому большие папки
+    # сканируются в пуле процессов; пул общий для всех папок - дерево передаётся в каждый процесс один раз
+    executor = None
+    try:
+        for folder in folders_to_scan:
+            folder_path = Path(folder)
+            if not folder_path.exists():
+                print(f"⚠️  Папка не найдена: {folder}")
+                continue
         
-        print(f"\n📂 Сканирование: {folder}")
-        try:
-            # Для Windows - только .exe файлы
-            if sys.platform == 'win32':
-                exe_files = list(folder_path.rglob('*.exe'))
-                print(f"   Найдено .exe файлов: {len(exe_files)}")
+            print(f"\n📂 Сканирование: {folder}")
+            try:
+                # Для Windows - только .exe файлы
+                if sys.platform == 'win32':
+                    exe_files = [Path(entry.path) for entry in FileAnalyzer.iter_file_entries(str(folder_path), ('.exe',))]
+                    print(f"   Найдено .exe файлов: {len(exe_files)}")
                 
-                findings = []
-                for i, exe_file in enumerate(exe_files):
-                    try:
-                        finding = file_scanner.scan_file(str(exe_file))
-                        if finding:
-                            # Попробуй сопоставить с реестром
-                            exe_path = str(exe_file.resolve())
-                            matched_program = None
+                    findings = []
+                    if exe_files:
+                        # Пул создаётся один раз на все папки и только для большой папки;
+                        # max_workers=None - по числу ядер (на Windows не больше 61)
+                        if executor is None and len(exe_files) >= PROCESS_POOL_MIN_EXE_FILES:
+                            executor = ProcessPoolExecutor(max_workers=None,
+                                                           initializer=init_worker_scanner,
+                                                           initargs=(tree,))
+                        scanned = scan_exe_files(executor, exe_files, tree)
+                        for i, (exe_file, finding) in enumerate(zip(exe_files, scanned)):
+                            try:
+                                if finding:
+                                    # Попробуй сопоставить с реестром
+                                    exe_path = str(exe_file.resolve())
+                                    matched_program = None
                             
-                            # Ищи по пути
-                            for install_path, prog_info in install_paths_map.items():
-                                if exe_path.lower().startswith(install_path):
-                                    matched_program = prog_info
-                                    break
+                                    # Ищи по пути
+                                    for install_path, prog_info in install_paths_map.items():
+                                        if exe_path.lower().startswith(install_path):
+                                            matched_program = prog_info
+                                            break
                             
-                            # Если нашли соответствие с реестром
-                            if matched_program:
-                                finding.software_name = matched_program['name']
-                                finding.software_version = matched_program['version']
+                                    # Если нашли соответствие с реестром
+                                    if matched_program:
+                                        finding.software_name = matched_program['name']
+                                        finding.software_version = matched_program['version']
                                 
-                                # Перепроверь уязвимости
-                                vulnerabilities = tree.find_vulnerabilities(
-                                    matched_program['name'],
-                                    matched_program['version']
-                                )
-                                finding.vulnerabilities = vulnerabilities
+                                        # Перепроверь уязвимости
+                                        vulnerabilities = tree.find_vulnerabilities(
+                                            matched_program['name'],
+                                            matched_program['version']
+                                        )
+                                        finding.vulnerabilities = vulnerabilities
                                 
-                                # Запомни соответствие
-                                registry_to_exe_map[matched_program['name']].append(exe_path)
+                                        # Запомни соответствие
+                                        registry_to_exe_map[matched_program['name']].append(exe_path)
                             
-                            findings.append(finding)
+                                    findings.append(finding)
                         
-                        # Показать прогресс
-                        if (i + 1) % 100 == 0:
-                            progress_bar(i + 1, len(exe_files))
-                    except Exception:
-                        continue
+                                # Показать прогресс
+                                if (i + 1) % 100 == 0:
+                                    progress_bar(i + 1, len(exe_files))
+                            except Exception:
+                                continue
                 
-                progress_bar(len(exe_files), len(exe_files))
-            else:
-                # Для Linux/macOS - использовать FolderScanner
-                scanner = FolderScanner(tree, max_workers=4)
-                findings = scanner.scan_folder(
-                    folder,
-                    progress_callback=progress_bar,
-                    parallel=True
-                )
-            total_findings.extend(findings)
+                    progress_bar(len(exe_files), len(exe_files))
+                else:
+                    # Для Linux/macOS - использовать FolderScanner
+                    scanner = FolderScanner(tree, max_workers=4)
+                    findings = scanner.scan_folder(
+                        folder,
+                        progress_callback=progress_bar,
+                        parallel=True
+                    )
+                total_findings.extend(findings)
             
-            vulnerable = len([f for f in findings if f.has_vulnerabilities()])
-            print(f"\n   ✅ Файлов: {len(findings)}, уязвимых: {vulnerable}")
-        except Exception as e:
-            print(f"   ❌ Ошибка: {e}")
+                vulnerable = len([f for f in findings if f.has_vulnerabilities()])
+                print(f"\n   ✅ Файлов: {len(findings)}, уязвимых: {vulnerable}")
+            except Exception as e:
+                print(f"   ❌ Ошибка: {e}")
+    
+    finally:
+        if executor is not None:
+            executor.shutdown()
     
     # Объедини все результаты
     all_findings.extend(total_findings)
@@ -420,29 +519,7 @@ def scan_system(tree, report_gen):
     # ПОКАЗАТЬ СООТВЕТСТВИЕ: РЕЕСТР -> .EXE (только для Windows)
     # ========================================================================
     if sys.platform == 'win32' and registry_to_exe_map:
-        print("\n" + "="*70)
-        print("📋 СООТВЕТСТВИЕ: ПРОГРАММЫ ИЗ РЕЕСТРА → НАЙДЕННЫЕ .EXE ФАЙЛЫ")
-        print("="*70)
-        
-        matched_programs = 0
-        for prog_name, exe_list in sorted(registry_to_exe_map.items()):
-            if exe_list:
-                matched_programs += 1
-                print(f"\n✅ {prog_name}")
-                for exe_path in exe_list[:3]:  # Показать первые 3 .exe
-                    print(f"   → {exe_path}")
-                if len(exe_list) > 3:
-                    print(f"   ... и ещё {len(exe_list) - 3} файлов")
-        
-        # Программы из реестра без найденных .exe
-        unmatched_programs = len(registry_results) - matched_programs
-        if unmatched_programs > 0:
-            print(f"\n⚠️  Программ из реестра без найденных .exe: {unmatched_programs}")
-        
-        print(f"\n📊 ИТОГОВАЯ СТАТИСТИКА СООТВЕТСТВИЯ:")
-        print(f"   • Программ из реестра: {len(registry_results)}")
-        print(f"   • Нашли .exe для программ: {matched_programs}")
-        print(f"   • Процент соответствия: {(matched_programs / len(registry_results) * 100):.1f}%")
+        print_registry_exe_mapping(registry_to_exe_map, len(registry_results))
     
     # ========================================================================
     # ОТЧЁТ
@@ -671,7 +748,7 @@ def scan_all_drives_combined(tree, report_gen):
                 continue
             
             # Найди все .exe файлы в папке и подпапках (рекурсивно)
-            exe_files = list(path_obj.rglob('*.exe'))
+            exe_files = [Path(entry.path) for entry in FileAnalyzer.iter_file_entries(str(path_obj), ('.exe',))]
             total_exe_found += len(exe_files)
             
             if exe_files:
@@ -760,29 +837,7 @@ def scan_all_drives_combined(tree, report_gen):
     # ========================================================================
     # ПОКАЗАТЬ СООТВЕТСТВИЕ: РЕЕСТР -> .EXE
     # ========================================================================
-    print("\n" + "="*70)
-    print("📋 СООТВЕТСТВИЕ: ПРОГРАММЫ ИЗ РЕЕСТРА → НАЙДЕННЫЕ .EXE ФАЙЛЫ")
-    print("="*70)
-    
-    matched_programs = 0
-    for prog_name, exe_list in sorted(registry_to_exe_map.items()):
-        if exe_list:
-            matched_programs += 1
-            print(f"\n✅ {prog_name}")
-            for exe_path in exe_list[:3]:  # Показать первые 3 .exe
-                print(f"   → {exe_path}")
-            if len(exe_list) > 3:
-                print(f"   ... и ещё {len(exe_list) - 3} файлов")
-    
-    # Программы из реестра без найденных .exe
-    unmatched_programs = len(registry_results) - matched_programs
-    if unmatched_programs > 0:
-        print(f"\n⚠️  Программ из реестра без найденных .exe: {unmatched_programs}")
-    
-    print(f"\n📊 ИТОГОВАЯ СТАТИСТИКА СООТВЕТСТВИЯ:")
-    print(f"   • Программ из реестра: {len(registry_results)}")
-    print(f"   • Нашли .exe для программ: {matched_programs}")
-    print(f"   • Процент соответствия: {(matched_programs / len(registry_results) * 100):.1f}%")
+    print_registry_exe_mapping(registry_to_exe_map, len(registry_results))
     
     # ========================================================================
     # 3. ОТЧЁТ
@@ -881,9 +936,9 @@ def main():
                 # Сканировать Program Files (x86) (Windows)
                 if sys.platform == 'win32':
                     folder_path = r"C:\Program Files (x86)"
-                    if Path(folder_path).exists():
+                    try:
                         scan_folder(folder_path, tree, report_gen, all_scanned_files)
-                    else:
+                    except FileNotFoundError:
                         print("❌ Папка Program Files (x86) не найдена")
                         continue
                 else:
@@ -903,9 +958,9 @@ def main():
                 # Сканировать /opt (Linux)
                 if sys.platform != 'win32':
                     folder_path = "/opt"
-                    if Path(folder_path).exists():
+                    try:
                         scan_folder(folder_path, tree, report_gen, all_scanned_files)
-                    else:
+                    except FileNotFoundError:
                         print("❌ Папка /opt не найдена")
                         continue
                 else:
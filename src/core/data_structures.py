@@ -2,10 +2,34 @@
 Основные структуры данных для представления уязвимостей
 """
 
+import json
+import re
+import sys
+from bisect import bisect_right
+from collections import Counter
+from functools import lru_cache
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Set, Iterator
 from enum import Enum
 
+# __slots__ для dataclass (параметр slots доступен с Python 3.10,
+# на более старых версиях классы остаются с обычным __dict__)
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+# Разделитель строк версий в индексе подстрок (не встречается в версиях)
+_VERSION_SEPARATOR = '\x00'
+
+# Регулярные выражения разбора версий
+_RE_NUM = re.compile(r'\d+')
+_RE_HAS_RANGE = re.compile(r'от|до|-', re.IGNORECASE)
+_RE_RANGE_RU = re.compile(r'от\s+([\d.]+)\s+до\s+([\d.]+)')
+_RE_RANGE_DASH = re.compile(r'([\d.]+)\s*-\s*([\d.]+)')
+_RE_FROM = re.compile(r'от\s+([\d.]+)')
+_RE_TO = re.compile(r'до\s+([\d.]+)')
+
+# Размер кэша результатов find_vulnerabilities (пары "ПО + версия")
+FIND_CACHE_SIZE = 16384
+
 
 class SeverityLevel(Enum):
     """Уровни опасности уязвимости"""
@@ -16,10 +40,11 @@ class SeverityLevel(Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
+@dataclass(eq=False, **_DATACLASS_SLOTS)
 class Vulnerability:
     """
     Представление уязвимости
+    Две уязвимости равны, если у них совпадает ID БДУ
     """
     bdu_id: str  # ID БДУ (BDU:2014-00001)
     cve_id: Optional[str] = None  # ID CVE (CVE-2011-4859)
@@ -34,7 +59,18 @@ class Vulnerability:
     cwe_description: str = ""  # Описание ошибки CWE
     published_date: Optional[str] = None  # Дата публикации
     exploit_available: bool = False  # Доступен ли эксплойт
-    additional_info: Dict[str, Any] = field(default_factory=dict)  # Дополнительная информация
+    recommendations: str = ""  # Возможные меры по устранению
+    remediation: str = ""  # Способ устранения
+    status: str = ""  # Статус уязвимости
+
+    @property
+    def additional_info(self) -> Dict[str, Any]:
+        """Дополнительная информация (рекомендации, способ устранения, статус) словарём"""
+        return {
+            'recommendations': self.recommendations,
+            'remediation': self.remediation,
+            'status': self.status,
+        }
 
     def to_dict(self) -> dict:
         """Преобразование в словарь"""
@@ -54,19 +90,40 @@ class Vulnerability:
             'exploit_available': self.exploit_available,
         }
 
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Vulnerability):
+            return NotImplemented
+        return self.bdu_id == other.bdu_id
+
+    def __hash__(self) -> int:
+        return hash(self.bdu_id)
+
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class SoftwareVersion:
     """
     Версия ПО с уязвимостями
     """
     version: str  # Версия (2.4.41, 12, от 8.4.0 до 8.4.16 включительно и т.д.)
     vulnerabilities: List[Vulnerability] = field(default_factory=list)  # Список уязвимостей
+    # ID БДУ уже добавленных уязвимостей (для быстрой проверки дублей)
+    _seen_bdu_ids: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
 
-    def add_vulnerability(self, vuln: Vulnerability) -> None:
-        """Добавить уязвимость"""
-        if vuln not in self.vulnerabilities:
-            self.vulnerabilities.append(vuln)
+    def __post_init__(self):
+        self._seen_bdu_ids.update(v.bdu_id for v in self.vulnerabilities)
+
+    def add_vulnerability(self, vuln: Vulnerability) -> bool:
+        """
+        Добавить уязвимость
+
+        Returns:
+            True, если уязвимость добавлена, False — если она уже была
+        """
+        if vuln.bdu_id in self._seen_bdu_ids:
+            return False
+        self._seen_bdu_ids.add(vuln.bdu_id)
+        self.vulnerabilities.append(vuln)
+        return True
 
     def get_vulnerabilities_by_severity(self, severity: SeverityLevel) -> List[Vulnerability]:
         """Получить уязвимости по уровню опасности"""
@@ -81,7 +138,7 @@ class SoftwareVersion:
         }
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class Software:
     """
     ПО (продукт) с его версиями и уязвимостями
@@ -90,13 +147,71 @@ class Software:
     vendor: str = ""  # Вендор (Mozilla Corp., Apache Software Foundation и т.д.)
     versions: Dict[str, SoftwareVersion] = field(default_factory=dict)  # Словарь версий
     software_type: str = ""  # Тип ПО (браузер, веб-сервер, СУБД и т.д.)
+    # Индекс подстрок версий: (склеенные строки версий, смещения начала, ключи версий).
+    # Строится лениво при первом поиске по подстроке и сбрасывается при добавлении версии
+    _version_index: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    # Разобранные границы версий: [(строка версии, (начало, конец) или None, SoftwareVersion)].
+    # Строится лениво при первом поиске по диапазонам и сбрасывается при добавлении версии
+    _version_ranges: Optional[list] = field(default=None, init=False, repr=False, compare=False)
+    # Счётчик критических уязвимостей (ведётся в add_vulnerability)
+    _critical_count: int = field(default=0, init=False, repr=False, compare=False)
 
     def add_version(self, version_str: str) -> SoftwareVersion:
         """Добавить или получить версию"""
         if version_str not in self.versions:
             self.versions[version_str] = SoftwareVersion(version=version_str)
+            self._version_index = None
+            self._version_ranges = None
         return self.versions[version_str]
 
+    def find_versions_containing(self, fragment: str) -> Set[str]:
+        """
+        Найти строки версий, содержащие подстроку
+        Все версии склеиваются в одну строку, поиск идёт через str.find,
+        а номер версии по смещению определяется бинарным поиском
+
+        Args:
+            fragment: Искомая подстрока (например, "12")
+
+        Returns:
+            Множество строк версий, содержащих подстроку
+        """
+        if self._version_index is None:
+            keys = list(self.versions)
+            starts = []
+            offset = 0
+            for key in keys:
+                starts.append(offset)
+                offset += len(key) + 1
+            self._version_index = (_VERSION_SEPARATOR.join(keys), starts, keys)
+
+        haystack, starts, keys = self._version_index
+        found = set()
+        if _VERSION_SEPARATOR in fragment:
+            return found
+
+        pos = haystack.find(fragment)
+        while pos != -1:
+            idx = bisect_right(starts, pos) - 1
+            found.add(keys[idx])
+            # Остальные вхождения в этой же версии не нужны — переходим к следующей
+            if idx + 1 >= len(starts):
+                break
+            pos = haystack.find(fragment, starts[idx + 1])
+        return found
+
+    def add_vulnerability(self, version_str: str, vuln: Vulnerability) -> bool:
+        """
+        Добавить уязвимость к версии (версия создаётся при необходимости)
+
+        Returns:
+            True, если уязвимость добавлена, False — если она уже была
+        """
+        added = self.add_version(version_str).add_vulnerability(vuln)
+        if added and vuln.severity == SeverityLevel.CRITICAL:
+            self._critical_count += 1
+        return added
+
     def get_version(self, version_str: str) -> Optional[SoftwareVersion]:
         """Получить версию"""
         return self.versions.get(version_str)
@@ -110,10 +225,7 @@ class Software:
 
     def get_critical_vulnerabilities_count(self) -> int:
         """Количество критических уязвимостей"""
-        count = 0
-        for version in self.versions.values():
-            count += len(version.get_vulnerabilities_by_severity(SeverityLevel.CRITICAL))
-        return count
+        return self._critical_count
 
     def to_dict(self) -> dict:
         """Преобразование в словарь"""
@@ -138,6 +250,41 @@ class VulnerabilityTree:
     def __init__(self):
         """Инициализация дерева"""
         self.root: Dict[str, Software] = {}  # Словарь ПО (ключ - название, значение - Software)
+        # Счётчики для get_statistics, обновляются в add_vulnerability
+        self._total_vulns = 0
+        self._sev_counts: Dict[SeverityLevel, int] = {level: 0 for level in SeverityLevel}
+        self._init_find_cache()
+
+    def _init_find_cache(self) -> None:
+        """Создать кэш результатов поиска (у каждого дерева — свой)"""
+        self._find_cached = lru_cache(maxsize=FIND_CACHE_SIZE)(self._find_vulnerabilities_uncached)
+
+    def __getstate__(self) -> dict:
+        """Состояние для pickle (кэш поиска не сохраняется)"""
+        state = self.__dict__.copy()
+        state.pop('_find_cached', None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """Восстановление из pickle"""
+        self.__dict__.update(state)
+        if '_sev_counts' not in state:
+            # Кэш, сохранённый до появления счётчиков
+            self._recount_statistics()
+        self._init_find_cache()
+
+    def _recount_statistics(self) -> None:
+        """Пересчитать счётчики статистики полным обходом дерева"""
+        sev_counter = Counter()
+        for software in self.root.values():
+            software_counter = Counter(vuln.severity
+                                       for version in software.versions.values()
+                                       for vuln in version.vulnerabilities)
+            software._critical_count = software_counter[SeverityLevel.CRITICAL]
+            sev_counter.update(software_counter)
+
+        self._total_vulns = sum(sev_counter.values())
+        self._sev_counts = {level: sev_counter[level] for level in SeverityLevel}
 
     def add_software(self, name: str, vendor: str = "", software_type: str = "") -> Software:
         """
@@ -172,8 +319,10 @@ class VulnerabilityTree:
             software_type: Тип ПО (если новое ПО)
         """
         software = self.add_software(software_name, vendor, software_type)
-        version = software.add_version(version_str)
-        version.add_vulnerability(vulnerability)
+        if software.add_vulnerability(version_str, vulnerability):
+            self._total_vulns += 1
+            self._sev_counts[vulnerability.severity] += 1
+        self._find_cached.cache_clear()
 
     def find_vulnerabilities(self, software_name: str, version: Optional[str] = None) -> List[Vulnerability]:
         """
@@ -185,8 +334,13 @@ class VulnerabilityTree:
             version: Версия (если None, ищет для всех версий)
             
         Returns:
-            Список уязвимостей
+            Список уязвимостей (результат кэшируется, изменять его нельзя)
         """
+        return self._find_cached(software_name, version)
+
+    def _find_vulnerabilities_uncached(self, software_name: str,
+                                       version: Optional[str] = None) -> List[Vulnerability]:
+        """Поиск уязвимостей без кэша (см. find_vulnerabilities)"""
         software = self.get_software(software_name)
         if not software:
             return []
@@ -215,8 +369,6 @@ class VulnerabilityTree:
         Returns:
             Список найденных уязвимостей
         """
-        import re
-        
         vulnerabilities = []
         
         try:
@@ -224,27 +376,19 @@ class VulnerabilityTree:
             target_parts = self._parse_version(target_version)
             if not target_parts:
                 return []
+
+            # Версии, в строке которых встречается целевая версия (например, "12 (Firefox)")
+            matched_versions = software.find_versions_containing(target_version)
             
             # Ищи в версиях, которые содержат диапазоны
-            for version_str, soft_version in software.versions.items():
-                # Проверь, является ли это диапазоном
-                if 'от' in version_str.lower() or 'до' in version_str.lower() or '-' in version_str:
-                    # Извлеки граничные версии
-                    start_version, end_version = self._parse_version_range(version_str)
-                    
-                    if start_version and end_version:
-                        start_parts = self._parse_version(start_version)
-                        end_parts = self._parse_version(end_version)
-                        
-                        if start_parts and end_parts:
-                            # Сравни версии
-                            if self._compare_versions(start_parts, target_parts) <= 0 and \
-                               self._compare_versions(target_parts, end_parts) <= 0:
-                                vulnerabilities.extend(soft_version.vulnerabilities)
-                                continue
+            for version_str, bounds, soft_version in self._get_version_ranges(software):
+                # Сравни версии (кортежи сравниваются поэлементно)
+                if bounds is not None and bounds[0] <= target_parts <= bounds[1]:
+                    vulnerabilities.extend(soft_version.vulnerabilities)
+                    continue
                 
                 # Также проверь точное совпадение (например, "12 (Firefox)")
-                if target_version in version_str or version_str.startswith(target_version):
+                if version_str in matched_versions:
                     vulnerabilities.extend(soft_version.vulnerabilities)
         
         except Exception:
@@ -252,6 +396,34 @@ class VulnerabilityTree:
         
         return vulnerabilities
 
+    def _get_version_ranges(self, software: Software) -> list:
+        """
+        Получить разобранные границы диапазонов версий ПО
+        Строки версий разбираются регулярными выражениями один раз, а не при каждом поиске
+        
+        Args:
+            software: Объект Software
+            
+        Returns:
+            Список (строка версии, (начало, конец) или None, SoftwareVersion) в порядке версий
+        """
+        if software._version_ranges is None:
+            ranges = []
+            for version_str, soft_version in software.versions.items():
+                bounds = None
+                # Проверь, является ли это диапазоном
+                if _RE_HAS_RANGE.search(version_str):
+                    # Извлеки граничные версии
+                    start_version, end_version = self._parse_version_range(version_str)
+                    if start_version and end_version:
+                        start_parts = self._parse_version(start_version)
+                        end_parts = self._parse_version(end_version)
+                        if start_parts and end_parts:
+                            bounds = (start_parts, end_parts)
+                ranges.append((version_str, bounds, soft_version))
+            software._version_ranges = ranges
+        return software._version_ranges
+
     @staticmethod
     def _parse_version(version_str: str) -> Optional[tuple]:
         """
@@ -261,10 +433,8 @@ class VulnerabilityTree:
         Returns:
             Кортеж чисел или None
         """
-        import re
-        
         # Извлеки все числа из строки
-        numbers = re.findall(r'\d+', version_str)
+        numbers = _RE_NUM.findall(version_str)
         if numbers:
             try:
                 return tuple(int(n) for n in numbers)
@@ -284,27 +454,25 @@ class VulnerabilityTree:
         Returns:
             Кортеж (start_version, end_version) или (None, None)
         """
-        import re
-        
-        version_str_lower = version_str.lower()
+        version_str_folded = version_str.casefold()
         
         # Паттерн: "от X до Y"
-        match = re.search(r'от\s+([\d.]+)\s+до\s+([\d.]+)', version_str_lower)
+        match = _RE_RANGE_RU.search(version_str_folded)
         if match:
             return (match.group(1), match.group(2))
         
         # Паттерн: "X - Y"
-        match = re.search(r'([\d.]+)\s*-\s*([\d.]+)', version_str)
+        match = _RE_RANGE_DASH.search(version_str)
         if match:
             return (match.group(1), match.group(2))
         
         # Паттерн: "от X" (всё после X)
-        match = re.search(r'от\s+([\d.]+)', version_str_lower)
+        match = _RE_FROM.search(version_str_folded)
         if match:
             return (match.group(1), "999.999.999")  # Очень большая версия как конец диапазона
         
         # Паттерн: "до X" (всё до X)
-        match = re.search(r'до\s+([\d.]+)', version_str_lower)
+        match = _RE_TO.search(version_str_folded)
         if match:
             return ("0.0.0", match.group(1))
         
@@ -320,58 +488,19 @@ class VulnerabilityTree:
             0 если version1 == version2
             1 если version1 > version2
         """
-        for v1, v2 in zip(version1, version2):
-            if v1 < v2:
-                return -1
-            elif v1 > v2:
-                return 1
-        
-        # Если одна версия является префиксом другой
-        if len(version1) < len(version2):
-            return -1
-        elif len(version1) > len(version2):
-            return 1
-        
-        return 0
+        return (version1 > version2) - (version1 < version2)
 
     def get_statistics(self) -> dict:
         """Получить статистику дерева"""
-        total_software = len(self.root)
-        total_versions = sum(len(sw.versions) for sw in self.root.values())
-        total_vulnerabilities = sum(len(sw.get_all_vulnerabilities()) for sw in self.root.values())
-        
-        # Подсчитай по уровням опасности
-        critical_count = 0
-        high_count = 0
-        medium_count = 0
-        low_count = 0
-        unknown_count = 0
-        
-        for software in self.root.values():
-            for vuln in software.get_all_vulnerabilities():
-                if hasattr(vuln, 'severity'):
-                    if vuln.severity == SeverityLevel.CRITICAL:
-                        critical_count += 1
-                    elif vuln.severity == SeverityLevel.HIGH:
-                        high_count += 1
-                    elif vuln.severity == SeverityLevel.MEDIUM:
-                        medium_count += 1
-                    elif vuln.severity == SeverityLevel.LOW:
-                        low_count += 1
-                    else:
-                        unknown_count += 1
-                else:
-                    unknown_count += 1
-
         return {
-            'total_software': total_software,
-            'total_versions': total_versions,
-            'total_vulnerabilities': total_vulnerabilities,
-            'critical_vulnerabilities': critical_count,
-            'high_vulnerabilities': high_count,
-            'medium_vulnerabilities': medium_count,
-            'low_vulnerabilities': low_count,
-            'unknown_vulnerabilities': unknown_count,
+            'total_software': len(self.root),
+            'total_versions': sum(len(sw.versions) for sw in self.root.values()),
+            'total_vulnerabilities': self._total_vulns,
+            'critical_vulnerabilities': self._sev_counts[SeverityLevel.CRITICAL],
+            'high_vulnerabilities': self._sev_counts[SeverityLevel.HIGH],
+            'medium_vulnerabilities': self._sev_counts[SeverityLevel.MEDIUM],
+            'low_vulnerabilities': self._sev_counts[SeverityLevel.LOW],
+            'unknown_vulnerabilities': self._sev_counts[SeverityLevel.UNKNOWN],
         }
 
     def to_dict(self) -> dict:
@@ -381,6 +510,32 @@ class VulnerabilityTree:
             'software': {name: sw.to_dict() for name, sw in self.root.items()},
         }
 
+    def iter_json_chunks(self, indent: int = 2) -> Iterator[str]:
+        """
+        Сериализовать дерево в JSON по частям
+        Результат совпадает с json.dumps(self.to_dict(), ensure_ascii=False, indent=indent),
+        но словарь строится только для одного ПО за раз
+
+        Args:
+            indent: Отступ JSON
+
+        Yields:
+            Фрагменты JSON-документа
+        """
+        pad = ' ' * indent
+
+        def dump(obj, level: int) -> str:
+            # Вложенный документ получает отступ своего уровня
+            return json.dumps(obj, ensure_ascii=False, indent=indent).replace('\n', '\n' + pad * level)
+
+        yield '{\n' + pad + '"statistics": ' + dump(self.get_statistics(), 1)
+        yield ',\n' + pad + '"software": {'
+        separator = '\n'
+        for name, software in self.root.items():
+            yield separator + pad * 2 + dump(name, 2) + ': ' + dump(software.to_dict(), 2)
+            separator = ',\n'
+        yield ('\n' + pad + '}' if self.root else '}') + '\n}'
+
     def __repr__(self) -> str:
         """Представление в виде строки"""
         stats = self.get_statistics()
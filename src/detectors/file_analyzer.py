@@ -3,9 +3,42 @@
 """
 
 import os
-import struct
-from pathlib import Path
-from typing import Optional, Dict
+import stat
+from dataclasses import dataclass
+from typing import Optional, Any, Dict, FrozenSet, Tuple, Union, Iterable, Iterator
+
+
+@dataclass
+class FileRecord:
+    """
+    Разобранный путь к файлу
+    Строится один раз на файл и передаётся во все проверки анализатора и детектора
+    """
+    __slots__ = ('path', 'name', 'suffix', 'norm_path', 'lower_path')
+
+    path: str  # Путь в исходном виде
+    name: str  # Имя файла
+    suffix: str  # Расширение в нижнем регистре (.exe)
+    norm_path: str  # Нормализованный путь (os.path.normpath)
+    lower_path: str  # Нормализованный путь в нижнем регистре
+
+
+@dataclass
+class FileInfo:
+    """Информация о файле (результат FileAnalyzer.get_file_info)"""
+    __slots__ = ('path', 'name', 'extension', 'is_file', 'size', 'is_executable', 'file_type')
+
+    path: str  # Абсолютный путь
+    name: str  # Имя файла
+    extension: str  # Расширение в нижнем регистре
+    is_file: bool  # Обычный файл
+    size: int  # Размер в байтах
+    is_executable: bool  # Исполняемый файл
+    file_type: Optional[str]  # Тип файла или None
+
+    def asdict(self) -> Dict[str, Any]:
+        """Преобразовать в словарь (для вывода в JSON)"""
+        return {name: getattr(self, name) for name in self.__slots__}
 
 
 class FileAnalyzer:
@@ -39,7 +72,7 @@ class FileAnalyzer:
     }
 
     # Расширения файлов для исполняемых файлов
-    EXECUTABLE_EXTENSIONS = {
+    EXECUTABLE_EXTENSIONS: FrozenSet[str] = frozenset({
         '.exe', '.sys', '.scr',  # Windows (только .exe для анализа)
         '.elf', '.so', '.sh', '.bin',    # Linux/Unix
         '.app', '.deb', '.rpm',          # Package managers
@@ -47,119 +80,160 @@ class FileAnalyzer:
         '.jar', '.class',                # Java
         '.py', '.pyc',                   # Python
         '.js', '.ts',                    # JavaScript/TypeScript
-    }
+    })
 
     # Безопасные расширения (НЕ анализировать)
-    SAFE_EXTENSIONS = {
+    SAFE_EXTENSIONS: FrozenSet[str] = frozenset({
         '.txt', '.log', '.md', '.json', '.xml', '.html', '.css',
         '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg',
         '.mp3', '.mp4', '.wav', '.avi',
-    }
+    })
+
+    # Системные папки (НЕ анализировать)
+    IGNORE_DIRS: FrozenSet[str] = frozenset({
+        '.git', '.venv', '__pycache__', 'node_modules', '.vscode',
+    })
 
     def __init__(self):
         """Инициализация анализатора"""
         pass
 
     @staticmethod
-    def is_executable(file_path: str) -> bool:
+    def make_record(file_path: Union[str, FileRecord]) -> FileRecord:
         """
-        Проверить, является ли файл исполняемым
+        Разобрать путь к файлу (если передан уже готовый FileRecord, он возвращается как есть)
         
         Args:
             file_path: Путь к файлу
             
+        Returns:
+            FileRecord
+        """
+        if isinstance(file_path, FileRecord):
+            return file_path
+        
+        path = os.fspath(file_path)
+        norm_path = os.path.normpath(path)
+        name = os.path.basename(norm_path)
+        return FileRecord(
+            path=path,
+            name=name,
+            suffix=os.path.splitext(name)[1].lower(),
+            norm_path=norm_path,
+            lower_path=norm_path.lower(),
+        )
+
+    @staticmethod
+    def is_executable(file_path: Union[str, FileRecord]) -> bool:
+        """
+        Проверить, является ли файл исполняемым
+        
+        Args:
+            file_path: Путь к файлу или FileRecord
+            
         Returns:
             True если файл исполняемый
         """
-        path = Path(file_path)
+        record = FileAnalyzer.make_record(file_path)
         
         # Проверь расширение
-        if path.suffix.lower() in FileAnalyzer.EXECUTABLE_EXTENSIONS:
+        if record.suffix in FileAnalyzer.EXECUTABLE_EXTENSIONS:
             return True
 
         # Проверь магический номер
-        try:
-            with open(file_path, 'rb') as f:
-                header = f.read(8)
-                
-                for magic, file_type in FileAnalyzer.MAGIC_SIGNATURES.items():
-                    if header.startswith(magic):
-                        # Проверь, исполняемый ли это файл
-                        if file_type in ['windows_exe', 'linux_elf', 'script']:
-                            return True
-        except (IOError, OSError):
-            return False
-
-        return False
+        return FileAnalyzer._read_magic_type(record.path) in _EXEC_TYPES
 
     @staticmethod
-    def is_safe_to_ignore(file_path: str) -> bool:
+    def is_safe_to_ignore(file_path: Union[str, FileRecord]) -> bool:
         """
         Проверить, нужно ли игнорировать файл при сканировании
         
         Args:
-            file_path: Путь к файлу
+            file_path: Путь к файлу или FileRecord
             
         Returns:
             True если файл можно игнорировать
         """
-        path = Path(file_path)
+        record = FileAnalyzer.make_record(file_path)
         
         # Игнорируй безопасные расширения
-        if path.suffix.lower() in FileAnalyzer.SAFE_EXTENSIONS:
+        if record.suffix in FileAnalyzer.SAFE_EXTENSIONS:
             return True
         
         # Игнорируй скрытые файлы и папки
-        if path.name.startswith('.'):
+        if record.name.startswith('.'):
             return True
         
         # Игнорируй системные папки
-        if path.name in ['.git', '.venv', '__pycache__', 'node_modules', '.vscode']:
+        if record.name in FileAnalyzer.IGNORE_DIRS:
             return True
 
         return False
 
     @staticmethod
-    def get_file_type(file_path: str) -> Optional[str]:
+    def get_file_type(file_path: Union[str, FileRecord]) -> Optional[str]:
         """
         Определить тип файла
         
         Args:
-            file_path: Путь к файлу
+            file_path: Путь к файлу или FileRecord
             
         Returns:
             Тип файла (windows_exe, linux_elf, zip, script и т.д.) или None
         """
-        path = Path(file_path)
+        record = FileAnalyzer.make_record(file_path)
         
         # По расширению
-        ext = path.suffix.lower()
-        if ext == '.exe':
-            return 'windows_exe'
-        elif ext == '.dll':
-            return 'windows_dll'
-        elif ext in ['.so', '.elf']:
-            return 'linux_elf'
-        elif ext in ['.py', '.pyc']:
-            return 'python'
-        elif ext in ['.sh', '.bash']:
-            return 'bash_script'
+        file_type = _TYPE_BY_EXTENSION.get(record.suffix)
+        if file_type:
+            return file_type
         
         # По магическому номеру
+        return FileAnalyzer._read_magic_type(record.path)
+
+    @staticmethod
+    def _read_magic_type(file_path: str) -> Optional[str]:
+        """
+        Прочитать заголовок файла и определить тип по магическому номеру
+        
+        Returns:
+            Тип файла или None (в том числе если файл не читается)
+        """
+        # Низкоуровневое чтение без буферизованного файлового объекта
         try:
-            with open(file_path, 'rb') as f:
-                header = f.read(8)
-                
-                for magic, file_type in FileAnalyzer.MAGIC_SIGNATURES.items():
-                    if header.startswith(magic):
-                        return file_type
+            fd = os.open(file_path, _HEADER_OPEN_FLAGS)
         except (IOError, OSError):
-            pass
+            return None
+        try:
+            return _match_magic(os.read(fd, _HEADER_SIZE))
+        except (IOError, OSError):
+            return None
+        finally:
+            os.close(fd)
 
-        return None
+    @staticmethod
+    def _probe_header(file_path: Union[str, FileRecord]) -> Tuple[Optional[str], bool]:
+        """
+        Определить тип файла и признак исполняемости за одно чтение заголовка
+        Заголовок читается, только если расширения недостаточно
+        
+        Args:
+            file_path: Путь к файлу или FileRecord
+            
+        Returns:
+            Кортеж (file_type, is_executable)
+        """
+        record = FileAnalyzer.make_record(file_path)
+        ext_type = _TYPE_BY_EXTENSION.get(record.suffix)
+        ext_executable = record.suffix in FileAnalyzer.EXECUTABLE_EXTENSIONS
+        if ext_type and ext_executable:
+            return ext_type, True
+        
+        magic_type = FileAnalyzer._read_magic_type(record.path)
+        return ext_type or magic_type, ext_executable or magic_type in _EXEC_TYPES
 
     @staticmethod
-    def get_file_info(file_path: str) -> Dict[str, any]:
+    def get_file_info(file_path: str) -> FileInfo:
         """
         Получить информацию о файле
         
@@ -167,27 +241,114 @@ class FileAnalyzer:
             file_path: Путь к файлу
             
         Returns:
-            Словарь с информацией о файле
+            FileInfo с информацией о файле
+            (для безопасных расширений заголовок не читается: тип не определяется)
         """
-        path = Path(file_path)
+        record = FileAnalyzer.make_record(file_path)
         
-        info = {
-            'path': str(path.absolute()),
-            'name': path.name,
-            'extension': path.suffix.lower(),
-            'is_file': path.is_file(),
-            'size': 0,
-            'is_executable': False,
-            'file_type': None,
-        }
+        is_file = False
+        size = 0
+        file_type = None
+        is_executable = False
         
+        # Один stat и для признака обычного файла, и для размера
         try:
-            if path.is_file():
-                info['size'] = path.stat().st_size
-                info['is_executable'] = FileAnalyzer.is_executable(file_path)
-                info['file_type'] = FileAnalyzer.get_file_type(file_path)
-        except (IOError, OSError):
+            file_stat = os.stat(file_path)
+            if stat.S_ISREG(file_stat.st_mode):
+                is_file = True
+                size = file_stat.st_size
+                # Файлы с безопасным расширением не исполняемые - заголовок не нужен
+                if record.suffix not in FileAnalyzer.SAFE_EXTENSIONS:
+                    file_type, is_executable = FileAnalyzer._probe_header(record)
+        except (IOError, OSError, ValueError):
             pass
 
-        return info
+        return FileInfo(os.path.abspath(file_path), record.name, record.suffix,
+                        is_file, size, is_executable, file_type)
+
+    @staticmethod
+    def iter_file_entries(root_path: str, extensions: Optional[Iterable[str]] = None) -> Iterator[os.DirEntry]:
+        """
+        Рекурсивно обойти папку через os.scandir
+        Символические ссылки на папки не раскрываются, недоступные подпапки пропускаются
+        
+        Args:
+            root_path: Корневая папка
+            extensions: Расширения в нижнем регистре (например, ('.exe',)); если None — все файлы
+            
+        Yields:
+            Записи os.DirEntry для файлов
+        """
+        suffixes = tuple(extensions) if extensions else None
+        
+        # Ошибка открытия корневой папки (например, FileNotFoundError) передаётся вызывающему
+        iterator = os.scandir(root_path)
+        pending = []
+        while iterator is not None:
+            with iterator:
+                for entry in iterator:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                            continue
+                        if not entry.is_file():
+                            continue
+                    except OSError:
+                        continue
+                    
+                    if suffixes is None or entry.name.lower().endswith(suffixes):
+                        yield entry
+            
+            # Следующая доступная подпапка
+            iterator = None
+            while pending and iterator is None:
+                try:
+                    iterator = os.scandir(pending.pop())
+                except OSError:
+                    pass
+
+
+# Сигнатуры, сгруппированные по первому байту (порядок внутри группы как в MAGIC_SIGNATURES)
+_MAGIC_BY_FIRSTBYTE: Dict[int, Tuple[Tuple[bytes, str], ...]] = {}
+for _magic, _file_type in FileAnalyzer.MAGIC_SIGNATURES.items():
+    _MAGIC_BY_FIRSTBYTE[_magic[0]] = _MAGIC_BY_FIRSTBYTE.get(_magic[0], ()) + ((_magic, _file_type),)
+del _magic, _file_type
+
+# Сколько байт заголовка читать для определения типа (с запасом для длинных сигнатур)
+_HEADER_SIZE = 16
 
+# Флаги открытия файла для чтения заголовка (O_BINARY есть только на Windows)
+_HEADER_OPEN_FLAGS = os.O_RDONLY | getattr(os, 'O_BINARY', 0)
+
+# Типы файлов по магическому номеру, которые считаются исполняемыми
+_EXEC_TYPES = frozenset({'windows_exe', 'linux_elf', 'script'})
+
+# Типы файлов по расширению
+_TYPE_BY_EXTENSION = {
+    '.exe': 'windows_exe',
+    '.dll': 'windows_dll',
+    '.so': 'linux_elf',
+    '.elf': 'linux_elf',
+    '.py': 'python',
+    '.pyc': 'python',
+    '.sh': 'bash_script',
+    '.bash': 'bash_script',
+}
+
+
+def _match_magic(header: bytes) -> Optional[str]:
+    """
+    Определить тип файла по первым байтам
+    
+    Args:
+        header: Начало файла
+        
+    Returns:
+        Тип файла или None
+    """
+    if not header:
+        return None
+    for magic, file_type in _MAGIC_BY_FIRSTBYTE.get(header[0], ()):
+        if header.startswith(magic):
+            return file_type
+    return None
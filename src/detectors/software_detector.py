@@ -2,22 +2,39 @@
 Детектор ПО - определяет название и версию ПО по пути, метаданным PE и реестру Windows
 """
 
+import mmap
 import os
 import re
+import struct
 import sys
-from pathlib import Path
-from typing import Optional, Tuple, List, Dict
-from .file_analyzer import FileAnalyzer
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple, List, Dict, Union
+from .file_analyzer import FileAnalyzer, FileRecord
 
 # Для работы с реестром Windows
 if sys.platform == 'win32':
     import winreg
 
+# Необязательный многошаблонный поиск сигнатур (если не установлен - используется re)
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+
+# Размер кэша результатов extract_pe_version
+PE_CACHE_SIZE = 8192
+
+# Файлы меньше этого размера разбираются без кэша (разбор дешевле, чем место в кэше)
+PE_CACHE_MIN_SIZE = 10 * 1024
+
 
 def extract_pe_version(file_path: str) -> Optional[Tuple[str, Optional[str]]]:
     """
     Извлечь название и версию ПО из метаданных PE файла
-    Читает ProductName, CompanyName, FileVersion, ProductVersion из .exe файлов
+    Результат кэшируется по (путь, mtime, размер): неизменённый файл повторно не разбирается
     
     Args:
         file_path: Путь к PE файлу (.exe)
@@ -26,14 +43,139 @@ def extract_pe_version(file_path: str) -> Optional[Tuple[str, Optional[str]]]:
         Кортеж (software_name, version) или None
     """
     try:
-        import pefile
+        stat = os.stat(file_path)
+    except (OSError, ValueError):
+        return None
+    
+    if stat.st_size < PE_CACHE_MIN_SIZE:
+        return _parse_pe_version(file_path)
+    return _cached_pe_version(file_path, stat.st_mtime_ns, stat.st_size)
+
+
+# Модуль pefile: None - ещё не загружен, False - не установлен
+_pefile_module = None
+
+
+def _get_pefile():
+    """
+    Загрузить pefile при первом обращении (модулям без разбора PE он не нужен)
+    
+    Returns:
+        Модуль pefile или None, если он не установлен
+    """
+    global _pefile_module
+    if _pefile_module is None:
+        try:
+            import pefile
+            _pefile_module = pefile
+        except ImportError:
+            _pefile_module = False
+    return _pefile_module or None
+
+
+@lru_cache(maxsize=PE_CACHE_SIZE)
+def _cached_pe_version(file_path: str, mtime_ns: int, size: int) -> Optional[Tuple[str, Optional[str]]]:
+    """Закэшированный _parse_pe_version (mtime_ns и size входят только в ключ кэша)"""
+    return _parse_pe_version(file_path)
+
+
+def _parse_pe_version(file_path: str) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    Разобрать метаданные PE файла
+    Файл отображается в память (mmap) один раз: по нему проверяются заголовки,
+    и он же передаётся в pefile
+    
+    Args:
+        file_path: Путь к PE файлу (.exe)
         
-        if not os.path.exists(file_path):
+    Returns:
+        Кортеж (software_name, version) или None
+    """
+    # Не PE файл (нет сигнатуры MZ) - не отдавай его pefile, который упадёт с исключением
+    try:
+        with open(file_path, 'rb') as f:
+            if f.read(2) != b'MZ':
+                return None
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    
+    try:
+        # Нет каталога ресурсов - нет и информации о версии
+        if not _may_have_resources(data):
             return None
+        return _parse_pe_resources(data, file_path)
+    finally:
+        # pe.close() не вызывается: он запускает полный gc.collect() на каждый файл
+        try:
+            data.close()
+        except BufferError:
+            # На отображение ещё есть ссылки - оно закроется при сборке мусора
+            pass
+
+
+def _may_have_resources(data: mmap.mmap) -> bool:
+    """
+    Проверить по заголовкам PE, может ли в файле быть каталог ресурсов
+    
+    Returns:
+        False, только если заголовки корректны и адрес каталога ресурсов нулевой
+        (в остальных случаях решает pefile)
+    """
+    try:
+        pe_offset = struct.unpack_from('<I', data, 0x3C)[0]
+        if data[pe_offset:pe_offset + 4] != b'PE\0\0':
+            return True
+        
+        # Опциональный заголовок идёт после сигнатуры (4 байта) и IMAGE_FILE_HEADER (20 байт)
+        optional_offset = pe_offset + 24
+        magic = struct.unpack_from('<H', data, optional_offset)[0]
+        layout = _PE_DATA_DIRECTORY_LAYOUT.get(magic)
+        if layout is None:
+            return True
+        count_offset, directories_offset = layout
+        
+        count = struct.unpack_from('<I', data, optional_offset + count_offset)[0] & 0x7FFFFFFF
+        if count <= _PE_RESOURCE_DIRECTORY_INDEX:
+            return True
+        
+        # IMAGE_DATA_DIRECTORY: VirtualAddress (4 байта) + Size (4 байта)
+        resource_rva = struct.unpack_from(
+            '<I', data, optional_offset + directories_offset + 8 * _PE_RESOURCE_DIRECTORY_INDEX)[0]
+        return resource_rva != 0
+    except (struct.error, ValueError):
+        return True
+
+
+# Смещения в опциональном заголовке PE: магическое число -> (NumberOfRvaAndSizes, DataDirectory)
+_PE_DATA_DIRECTORY_LAYOUT = {
+    0x10B: (92, 96),    # PE32
+    0x20B: (108, 112),  # PE32+
+}
+
+# Номер каталога ресурсов в DataDirectory (IMAGE_DIRECTORY_ENTRY_RESOURCE)
+_PE_RESOURCE_DIRECTORY_INDEX = 2
+
+
+def _parse_pe_resources(data: mmap.mmap, file_path: str) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    Прочитать ProductName, FileVersion, ProductVersion из ресурсов PE файла
+    
+    Args:
+        data: Содержимое файла (mmap)
+        file_path: Путь к файлу (для имени, если в ресурсах его нет)
         
+    Returns:
+        Кортеж (software_name, version) или None
+    """
+    pefile = _get_pefile()
+    if pefile is None:
+        return None
+    
+    try:
         # Попробуй загрузить как PE файл
         try:
-            pe = pefile.PE(file_path, fast_load=True)
+            pe = pefile.PE(data=data, fast_load=True)
         except (pefile.PEFormatError, OSError, IOError):
             return None
         
@@ -42,7 +184,6 @@ def extract_pe_version(file_path: str) -> Optional[Tuple[str, Optional[str]]]:
         version = None
         product_version = None
         file_version = None
-        company = None
         
         try:
             # Загрузи полную информацию о версии
@@ -79,14 +220,6 @@ def extract_pe_version(file_path: str) -> Optional[Tuple[str, Optional[str]]]:
                                     else:
                                         file_version = str(fv).strip()
                                 
-                                # Получи CompanyName
-                                if b'CompanyName' in entries:
-                                    comp = entries[b'CompanyName']
-                                    if isinstance(comp, bytes):
-                                        company = comp.decode('utf-8', errors='ignore').strip()
-                                    else:
-                                        company = str(comp).strip()
-                                
                                 # Если нет ProductName, попробуй FileDescription
                                 if not software_name and b'FileDescription' in entries:
                                     fd = entries[b'FileDescription']
@@ -147,18 +280,49 @@ def extract_pe_version(file_path: str) -> Optional[Tuple[str, Optional[str]]]:
     
     except Exception:
         return None
-    finally:
-        # Закрой PE файл если он был открыт
-        try:
-            if 'pe' in locals():
-                pe.close()
-        except:
-            pass
 
 
 def get_installed_software_from_registry() -> Dict[str, Dict[str, str]]:
     """
     Получить список установленного ПО из реестра Windows
+    Реестр читается один раз, дальше возвращается закэшированный результат
+    (сбросить кэш - invalidate_registry_cache). Словарь общий, не изменяйте его
+    
+    Returns:
+        Словарь {software_name: {version, install_path}}
+    """
+    return _registry_snapshot()[0]
+
+
+def invalidate_registry_cache() -> None:
+    """Сбросить кэш установленного ПО (следующий вызов заново прочитает реестр)"""
+    _registry_snapshot.cache_clear()
+
+
+@lru_cache(maxsize=1)
+def _registry_snapshot() -> Tuple[Dict[str, Dict[str, str]], Dict[str, Dict[str, str]], Tuple[Tuple[str, Dict[str, str]], ...]]:
+    """
+    Прочитать реестр и построить индексы имён в нижнем регистре
+    
+    Returns:
+        Кортеж (installed_software, {name_lower: info}, ((name_lower, info), ...) от длинных имён к коротким)
+    """
+    installed = _read_installed_software_from_registry()
+    lower_index = {}
+    for name, info in installed.items():
+        lower_index.setdefault(name.lower(), info)
+    # Более длинные (специфичные) имена проверяются первыми
+    tokens = tuple(sorted(lower_index.items(), key=lambda item: -len(item[0])))
+    return installed, lower_index, tokens
+
+
+# Ветка реестра со списком установленных программ
+_UNINSTALL_KEY = r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"
+
+
+def _read_installed_software_from_registry() -> Dict[str, Dict[str, str]]:
+    """
+    Прочитать список установленного ПО из реестра Windows
     Сканирует все основные ветки реестра:
     - HKEY_LOCAL_MACHINE (64-bit и 32-bit приложения)
     - HKEY_CURRENT_USER (пользовательские приложения)
@@ -171,101 +335,299 @@ def get_installed_software_from_registry() -> Dict[str, Dict[str, str]]:
     
     installed_software = {}
     
-    # Список всех веток реестра для сканирования
-    registry_paths = [
+    # Список всех веток реестра для сканирования: (корень, права доступа)
+    # Представление 64/32-bit выбирается флагом KEY_WOW64_*, а не путём через Wow6432Node,
+    # поэтому обе ветки читаются корректно и из 32-bit, и из 64-bit Python
+    registry_views = [
         # HKEY_LOCAL_MACHINE - системные приложения (64-bit)
-        (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"),
+        (winreg.HKEY_LOCAL_MACHINE, winreg.KEY_READ | winreg.KEY_WOW64_64KEY),
         # HKEY_LOCAL_MACHINE - системные приложения (32-bit на 64-bit системе)
-        (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Wow6432Node\Microsoft\Windows\CurrentVersion\Uninstall"),
+        (winreg.HKEY_LOCAL_MACHINE, winreg.KEY_READ | winreg.KEY_WOW64_32KEY),
         # HKEY_CURRENT_USER - пользовательские приложения
-        (winreg.HKEY_CURRENT_USER, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"),
+        (winreg.HKEY_CURRENT_USER, winreg.KEY_READ),
     ]
     
-    for root_key, key_path in registry_paths:
-        try:
-            key = winreg.OpenKey(root_key, key_path)
-        except WindowsError:
-            # Ветка не существует или недоступна, пропускаем
-            continue
+    # Ветки независимы (свой дескриптор у каждой), а вызовы winreg отпускают GIL,
+    # поэтому они читаются параллельно. Слияние идёт в исходном порядке веток,
+    # так что результат совпадает с последовательным обходом
+    with ThreadPoolExecutor(max_workers=len(registry_views)) as executor:
+        views_entries = list(executor.map(lambda view: _read_uninstall_entries(*view), registry_views))
+    
+    for entries in views_entries:
+        for display_name, display_version, install_location in entries:
+            try:
+                # Не перезаписывай если уже есть запись с путём
+                if display_name in installed_software:
+                    existing_path = installed_software[display_name]['install_path']
+                    if existing_path == 'unknown' and install_location:
+                        installed_software[display_name]['install_path'] = install_location
+                else:
+                    installed_software[display_name] = {
+                        'version': display_version.strip() if display_version else 'unknown',
+                        'install_path': install_location.strip() if install_location else 'unknown'
+                    }
+            except Exception:
+                # Пропусти проблемную запись (например, значение не строкового типа)
+                continue
+    
+    return installed_software
+
+
+def _read_uninstall_entries(root_key, access: int) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """
+    Прочитать записи ветки Uninstall
+    
+    Args:
+        root_key: Корневой раздел реестра (HKEY_*)
+        access: Права доступа для OpenKey (KEY_READ | KEY_WOW64_*)
         
-        index = 0
-        while True:
+    Returns:
+        Список (DisplayName, DisplayVersion, InstallLocation) в порядке подключей
+    """
+    entries = []
+    try:
+        key = winreg.OpenKey(root_key, _UNINSTALL_KEY, 0, access)
+    except WindowsError:
+        # Ветка не существует или недоступна, пропускаем
+        return entries
+    
+    with key:
+        # Число подключей известно заранее: цикл по range, а не до исключения от EnumKey
+        subkey_count = winreg.QueryInfoKey(key)[0]
+        for index in range(subkey_count):
             try:
                 subkey_name = winreg.EnumKey(key, index)
-                subkey = winreg.OpenKey(key, subkey_name)
-                
-                try:
-                    display_name = winreg.QueryValueEx(subkey, 'DisplayName')[0]
-                except WindowsError:
-                    display_name = None
-                
-                # Попробуй получить версию
-                try:
-                    display_version = winreg.QueryValueEx(subkey, 'DisplayVersion')[0]
-                except WindowsError:
-                    display_version = None
-                
-                # Попробуй получить путь установки
-                install_location = None
-                try:
-                    install_location = winreg.QueryValueEx(subkey, 'InstallLocation')[0]
-                except WindowsError:
-                    pass
-                
-                # Если нет InstallLocation, попробуй найти путь к исполняемому файлу
-                if not install_location or install_location.strip() == '':
-                    try:
-                        # Попробуй DisplayIcon (часто содержит путь к .exe)
-                        display_icon = winreg.QueryValueEx(subkey, 'DisplayIcon')[0]
-                        if display_icon:
-                            # Извлеки путь к папке из пути к иконке
-                            icon_path = Path(display_icon.split(',')[0].strip('"'))
-                            if icon_path.exists():
-                                install_location = str(icon_path.parent)
-                    except (WindowsError, OSError):
-                        pass
-                
-                # Если всё ещё нет пути, попробуй UninstallString
-                if not install_location or install_location.strip() == '':
-                    try:
-                        uninstall_string = winreg.QueryValueEx(subkey, 'UninstallString')[0]
-                        if uninstall_string:
-                            # Извлеки путь из строки деинсталляции
-                            uninstall_path = Path(uninstall_string.split('"')[1] if '"' in uninstall_string else uninstall_string.split()[0])
-                            if uninstall_path.exists():
-                                install_location = str(uninstall_path.parent)
-                    except (WindowsError, IndexError, OSError):
-                        pass
-                
-                # Добавь в список если есть название
-                if display_name and display_name.strip():
-                    # Не перезаписывай если уже есть запись с путём
-                    if display_name in installed_software:
-                        existing_path = installed_software[display_name]['install_path']
-                        if existing_path == 'unknown' and install_location:
-                            installed_software[display_name]['install_path'] = install_location
-                    else:
-                        installed_software[display_name] = {
-                            'version': display_version.strip() if display_version else 'unknown',
-                            'install_path': install_location.strip() if install_location else 'unknown'
-                        }
+                with winreg.OpenKey(key, subkey_name) as subkey:
+                    display_name = _query_value(subkey, 'DisplayName')
+                    # Записи без названия (обновления, компоненты) не нужны - остальные значения не читаем
+                    if not display_name or not display_name.strip():
+                        continue
+                    
+                    display_version = _query_value(subkey, 'DisplayVersion')
+                    install_location = _query_value(subkey, 'InstallLocation')
+                    
+                    # Если нет InstallLocation, попробуй найти путь по DisplayIcon / UninstallString
+                    if not install_location or install_location.strip() == '':
+                        install_location = _guess_install_location(subkey) or install_location
                 
-                winreg.CloseKey(subkey)
-                index += 1
-            except WindowsError:
-                # Больше нет подключей
-                break
+                entries.append((display_name, display_version, install_location))
             except Exception:
-                # Пропусти проблемную запись
-                index += 1
+                # Пропусти проблемную запись (в том числе недоступный подключ)
                 continue
-        
+    
+    return entries
+
+
+def _query_value(subkey, name: str):
+    """
+    Прочитать значение из раздела реестра
+    
+    Returns:
+        Значение или None, если его нет
+    """
+    try:
+        return winreg.QueryValueEx(subkey, name)[0]
+    except OSError:
+        return None
+
+
+def _guess_install_location(subkey) -> Optional[str]:
+    """
+    Определить папку установки по пути к исполняемому файлу из DisplayIcon или UninstallString
+    
+    Returns:
+        Путь к папке или None
+    """
+    # Попробуй DisplayIcon (часто содержит путь к .exe)
+    display_icon = _query_value(subkey, 'DisplayIcon')
+    if display_icon:
         try:
-            winreg.CloseKey(key)
-        except:
+            # Извлеки путь к папке из пути к иконке
+            icon_path = display_icon.split(',')[0].strip('"')
+            if os.path.exists(icon_path):
+                return os.path.dirname(icon_path)
+        except (AttributeError, ValueError):
             pass
     
-    return installed_software
+    # Если всё ещё нет пути, попробуй UninstallString
+    uninstall_string = _query_value(subkey, 'UninstallString')
+    if uninstall_string:
+        try:
+            # Извлеки путь из строки деинсталляции
+            uninstall_path = uninstall_string.split('"')[1] if '"' in uninstall_string else uninstall_string.split()[0]
+            if os.path.exists(uninstall_path):
+                return os.path.dirname(uninstall_path)
+        except (AttributeError, IndexError, ValueError):
+            pass
+    
+    return None
+
+
+# Метасимволы регулярных выражений (сигнатура без них — обычная подстрока)
+_REGEX_METACHARS = frozenset('.^$*+?{}[]|()')
+
+
+def _literal_needle(pattern: str) -> Optional[str]:
+    """
+    Получить подстроку, если регулярное выражение не содержит метасимволов
+    Экранированные символы (\\. \\+) считаются обычными, классы (\\d, \\w) — нет
+    
+    Returns:
+        Подстрока или None, если это настоящее регулярное выражение
+    """
+    chars = []
+    escaped = False
+    for ch in pattern:
+        if escaped:
+            if ch.isalnum():
+                return None
+            chars.append(ch)
+            escaped = False
+        elif ch == '\\':
+            escaped = True
+        elif ch in _REGEX_METACHARS:
+            return None
+        else:
+            chars.append(ch)
+    if escaped:
+        return None
+    return ''.join(chars)
+
+
+def _split_alternatives(pattern: str) -> List[str]:
+    """Разбить регулярное выражение по | верхнего уровня (вне скобок и классов [...])"""
+    parts = []
+    start = 0
+    depth = 0
+    in_class = False
+    escaped = False
+    for index, ch in enumerate(pattern):
+        if escaped:
+            escaped = False
+        elif ch == '\\':
+            escaped = True
+        elif in_class:
+            in_class = ch != ']'
+        elif ch == '[':
+            in_class = True
+        elif ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif ch == '|' and depth == 0:
+            parts.append(pattern[start:index])
+            start = index + 1
+    parts.append(pattern[start:])
+    return parts
+
+
+def _literal_prefix(pattern: str) -> str:
+    """Обычная подстрока, с которой начинается любое совпадение регулярного выражения"""
+    chars = []
+    index = 0
+    while index < len(pattern):
+        ch = pattern[index]
+        if ch == '\\':
+            if index + 1 >= len(pattern) or pattern[index + 1].isalnum():
+                break
+            literal = pattern[index + 1]
+            index += 2
+        elif ch in _REGEX_METACHARS:
+            break
+        else:
+            literal = ch
+            index += 1
+        # Символ с квантификатором ?, * или {m,n} может отсутствовать
+        if index < len(pattern) and pattern[index] in '?*{':
+            break
+        chars.append(literal)
+    return ''.join(chars)
+
+
+def _required_literals(pattern: str) -> Optional[Tuple[str, ...]]:
+    """
+    Получить подстроки-фильтр для регулярного выражения: без хотя бы одной из них совпадения нет
+    
+    Returns:
+        Кортеж подстрок (по одной на альтернативу) или None, если фильтр построить нельзя
+    """
+    literals = tuple(_literal_prefix(part) for part in _split_alternatives(pattern))
+    if not all(literals):
+        return None
+    return literals
+
+
+@lru_cache(maxsize=None)
+def _compile_signatures(signatures: Tuple[Tuple[str, str, str], ...]) -> Tuple[Tuple['re.Pattern', str, str], ...]:
+    """
+    Скомпилировать сигнатуры один раз на процесс (а не в каждом экземпляре детектора)
+
+    Встроенный префикс (?i) заменяется флагом re.IGNORECASE при компиляции
+    """
+    compiled = []
+    for pattern, name, type_ in signatures:
+        if pattern.startswith('(?i)'):
+            compiled.append((re.compile(pattern[4:], re.IGNORECASE), name, type_))
+        else:
+            compiled.append((re.compile(pattern), name, type_))
+    return tuple(compiled)
+
+
+@lru_cache(maxsize=None)
+def _compile_hyperscan(signatures: Tuple[Tuple[str, str, str], ...]):
+    """
+    Скомпилировать все сигнатуры в одну базу Hyperscan (один проход по пути вместо цикла по сигнатурам)
+    
+    Returns:
+        База hyperscan.Database или None, если hyperscan не установлен или не принял паттерны
+    """
+    if hyperscan is None:
+        return None
+    expressions = []
+    flags = []
+    for pattern, _, _ in signatures:
+        if pattern.startswith('(?i)'):
+            expressions.append(pattern[4:].encode('utf-8'))
+            flags.append(hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH)
+        else:
+            expressions.append(pattern.encode('utf-8'))
+            flags.append(hyperscan.HS_FLAG_SINGLEMATCH)
+    try:
+        database = hyperscan.Database()
+        database.compile(expressions=expressions, ids=list(range(len(signatures))),
+                         elements=len(signatures), flags=flags)
+    except Exception:
+        return None
+    return database
+
+
+# Scratch-память Hyperscan нельзя использовать из двух потоков одновременно -
+# у каждого потока своя (по одной на базу)
+_hyperscan_local = threading.local()
+
+
+def _hyperscan_scratch(database):
+    """
+    Получить scratch-память Hyperscan текущего потока для базы
+    
+    Args:
+        database: База hyperscan.Database
+        
+    Returns:
+        Объект hyperscan.Scratch, принадлежащий только текущему потоку
+    """
+    scratches = getattr(_hyperscan_local, 'scratches', None)
+    if scratches is None:
+        scratches = _hyperscan_local.scratches = {}
+    scratch = scratches.get(id(database))
+    if scratch is None:
+        scratch = scratches[id(database)] = hyperscan.Scratch(database)
+    return scratch
+
+
+def _collect_hyperscan_hit(signature_id: int, start: int, end: int, flags: int, hits: List[int]) -> None:
+    """Обработчик совпадений Hyperscan: запомнить номер сработавшей сигнатуры"""
+    hits.append(signature_id)
 
 
 class SoftwareDetector:
@@ -277,6 +639,8 @@ class SoftwareDetector:
     # Сигнатуры для определения ПО
     # Формат: (regex_pattern, software_name, software_type)
     # ВАЖНО: Специфичные сигнатуры должны быть ПЕРЕД общими!
+    # Побеждает первая сработавшая сигнатура списка, а не самое левое совпадение в пути,
+    # поэтому сигнатуры нельзя объединять в одно регулярное выражение через |
     SOFTWARE_SIGNATURES = [
         # Firefox (более специфично, перед общими Windows путями)
         (r'(?i)firefox', 'Firefox', 'browser'),
@@ -360,83 +724,142 @@ class SoftwareDetector:
         ('/etc/', 'Linux', 'operating_system'),
     ]
 
+    # Специфичные версии по ключевому слову в пути (в нижнем регистре)
+    # Формат: (keyword, version_regex или готовая версия)
+    # Регулярные выражения применяются к пути в нижнем регистре, поэтому без IGNORECASE
+    _VERSION_EXTRACTORS = (
+        # Python27 -> 2.7
+        ('python27', '2.7'),
+        # jdk1.8 -> 1.8
+        ('jdk', re.compile(r'jdk[_-]?(\d+(?:\.\d+)*)')),
+        # Firefox12, Firefox 12, Firefox-12 -> 12
+        ('firefox', re.compile(r'firefox[_-]?(\d+(?:\.\d+)*)')),
+        # Chrome/Chrome 90 -> 90
+        ('chrome', re.compile(r'chrome[_-]?(\d+(?:\.\d+)*)')),
+    )
+
+    # Паттерны версии в пути (порядок важен: побеждает первый сработавший паттерн,
+    # а не самое левое совпадение, поэтому в одну альтернацию они не объединяются)
+    _VERSION_PATH_PATTERNS = (
+        # Паттерны вида: \SoftwareName\Version\file
+        re.compile(r'\\([a-zA-Z0-9._\-]+)\\(\d+(?:\.\d+)*)\\'),
+        # Linux паттерны вида: /opt/SoftwareName/Version/file
+        re.compile(r'/([a-zA-Z0-9._\-]+)/(\d+(?:\.\d+)*)/'),
+        # Просто версия в квадратных скобках: [version]
+        re.compile(r'\[(\d+(?:\.\d+)*)\]'),
+        # Version с подчёркиванием: soft_v1.2.3
+        re.compile(r'[_-]v?(\d+(?:\.\d+)*)'),
+        # Version в слеше: /1.2.3/
+        re.compile(r'/(\d+(?:\.\d+)*)/'),
+    )
+
+    # Версия в имени файла
+    _VERSION_IN_FILENAME = re.compile(r'v?(\d+(?:\.\d+)*)')
+
+    # Поиск любой цифры (без неё версию в пути не найти)
+    _HAS_DIGIT = re.compile(r'\d').search
+
 
     def __init__(self):
         """Инициализация детектора"""
-        self.compiled_signatures = [
-            (re.compile(pattern), name, type_) 
-            for pattern, name, type_ in self.SOFTWARE_SIGNATURES
-        ]
+        self.compiled_signatures = list(_compile_signatures(tuple(self.SOFTWARE_SIGNATURES)))
+        # Проверки для detect_software: (подстроки-фильтр, без учёта регистра, метод search, результат).
+        # Сигнатура без метасимволов проверяется только оператором in (search = None), остальные —
+        # регулярным выражением, но лишь если в пути есть одна из подстрок, с которых начинается
+        # совпадение ('' — фильтра нет)
+        checks = []
+        for (pattern, name, type_), (compiled, _, _) in zip(self.SOFTWARE_SIGNATURES,
+                                                            self.compiled_signatures):
+            ignore_case = pattern.startswith('(?i)')
+            body = pattern[4:] if ignore_case else pattern
+            needle = _literal_needle(body)
+            if needle is not None:
+                literals, search = (needle,), None
+            else:
+                literals, search = _required_literals(body) or ('',), compiled.search
+            if ignore_case:
+                literals = tuple(literal.lower() for literal in literals)
+            checks.append((literals, ignore_case, search, (name, type_)))
+        self._signature_checks = tuple(checks)
+        # База Hyperscan со всеми сигнатурами (None - используется цикл по _signature_checks)
+        self._hyperscan_db = _compile_hyperscan(tuple(self.SOFTWARE_SIGNATURES))
+        self._signature_results = tuple((name, type_) for _, name, type_ in self.SOFTWARE_SIGNATURES)
 
-    def detect_software(self, file_path: str) -> Optional[Tuple[str, str]]:
+    def detect_software(self, file_path: Union[str, FileRecord]) -> Optional[Tuple[str, str]]:
         """
         Определить ПО и тип по пути файла
         
         Args:
-            file_path: Полный путь к файлу
+            file_path: Полный путь к файлу или FileRecord
             
         Returns:
             Кортеж (software_name, software_type) или None
         """
-        # Нормализуй путь
-        normalized_path = os.path.normpath(file_path)
-        
-        # Проверь сигнатуры
-        for pattern, software_name, software_type in self.compiled_signatures:
-            if pattern.search(normalized_path):
-                return (software_name, software_type)
+        # Нормализованный путь (и он же в нижнем регистре)
+        record = FileAnalyzer.make_record(file_path)
+        normalized_path = record.norm_path
+        lower_path = record.lower_path
+        
+        if self._hyperscan_db is not None:
+            # Hyperscan сообщает все совпадения за один проход - побеждает сигнатура с меньшим номером
+            hits = []
+            try:
+                self._hyperscan_db.scan(normalized_path.encode('utf-8', 'surrogatepass'),
+                                        match_event_handler=_collect_hyperscan_hit, context=hits,
+                                        scratch=_hyperscan_scratch(self._hyperscan_db))
+            except Exception:
+                # Ошибка Hyperscan не должна терять определение ПО - проверь сигнатуры циклом ниже
+                hits = None
+            if hits is not None:
+                return self._signature_results[min(hits)] if hits else None
+        
+        # Проверь сигнатуры (первая подходящая по порядку списка).
+        # Кэш по папке здесь не нужен: ключ "папка" не точен (имя файла может совпасть
+        # с более приоритетной сигнатурой), а точный вариант медленнее этого цикла
+        for literals, ignore_case, search, detection in self._signature_checks:
+            haystack = lower_path if ignore_case else normalized_path
+            for literal in literals:
+                if literal in haystack:
+                    break
+            else:
+                continue
+            if search is None or search(normalized_path):
+                return detection
         
         return None
 
-    def detect_version(self, file_path: str) -> Optional[str]:
+    def detect_version(self, file_path: Union[str, FileRecord]) -> Optional[str]:
         """
         Определить версию ПО из пути файла
         
         Args:
-            file_path: Полный путь к файлу
+            file_path: Полный путь к файлу или FileRecord
             
         Returns:
             Строка версии или None
         """
-        normalized_path = os.path.normpath(file_path)
-        
-        # Сначала попробуй специфичные паттерны для наших тестов
-        # Python27 -> 2.7
-        if 'Python27' in normalized_path or 'python27' in normalized_path.lower():
-            return '2.7'
+        record = FileAnalyzer.make_record(file_path)
+        normalized_path = record.norm_path
         
-        # jdk1.8 -> 1.8
-        if 'jdk1.8' in normalized_path or 'jdk' in normalized_path.lower():
-            match = re.search(r'jdk[_-]?(\d+(?:\.\d+)*)', normalized_path, re.IGNORECASE)
-            if match:
-                return match.group(1)
+        lower_path = record.lower_path
         
-        # Firefox12, Firefox 12, Firefox-12 -> 12
-        if 'firefox' in normalized_path.lower():
-            match = re.search(r'firefox[_-]?(\d+(?:\.\d+)*)', normalized_path, re.IGNORECASE)
-            if match:
-                return match.group(1)
+        # Все паттерны версии требуют цифру: путь без цифр не проверяй
+        if not self._HAS_DIGIT(normalized_path):
+            return None
         
-        # Chrome/Chrome 90 -> 90
-        if 'chrome' in normalized_path.lower():
-            match = re.search(r'chrome[_-]?(\d+(?:\.\d+)*)', normalized_path, re.IGNORECASE)
+        # Сначала попробуй специфичные паттерны для наших тестов
+        for keyword, extractor in self._VERSION_EXTRACTORS:
+            if keyword not in lower_path:
+                continue
+            if isinstance(extractor, str):
+                return extractor
+            match = extractor.search(lower_path)
             if match:
                 return match.group(1)
         
         # Ищи паттерны версии в пути
-        for path_pattern, version_pattern in [
-            # Паттерны вида: \SoftwareName\Version\file
-            (r'\\([a-zA-Z0-9._\-]+)\\(\d+(?:\.\d+)*)\\', r'(\d+(?:\.\d+)*)'),
-            # Linux паттерны вида: /opt/SoftwareName/Version/file
-            (r'/([a-zA-Z0-9._\-]+)/(\d+(?:\.\d+)*)/', r'(\d+(?:\.\d+)*)'),
-            # Просто версия в квадратных скобках: [version]
-            (r'\[(\d+(?:\.\d+)*)\]', r'(\d+(?:\.\d+)*)'),
-            # Version с подчёркиванием: soft_v1.2.3
-            (r'[_-]v?(\d+(?:\.\d+)*)', r'(\d+(?:\.\d+)*)'),
-            # Version в слеше: /1.2.3/
-            (r'/(\d+(?:\.\d+)*)/', r'(\d+(?:\.\d+)*)'),
-        ]:
-            matches = re.findall(path_pattern, normalized_path)
+        for path_pattern in self._VERSION_PATH_PATTERNS:
+            matches = path_pattern.findall(normalized_path)
             if matches:
                 # Для первого паттерна (SoftwareName\Version\file), вернись вторую группу
                 if isinstance(matches[0], tuple):
@@ -445,23 +868,24 @@ class SoftwareDetector:
                     return matches[-1]  # Последняя найденная версия
         
         # Попробуй извлечь версию из имени файла
-        filename = Path(file_path).name
-        match = re.search(r'v?(\d+(?:\.\d+)*)', filename)
+        match = self._VERSION_IN_FILENAME.search(record.name)
         if match:
             return match.group(1)
         
         return None
 
-    def detect_from_file(self, file_path: str) -> Optional[Tuple[str, Optional[str]]]:
+    def detect_from_file(self, file_path: Union[str, FileRecord]) -> Optional[Tuple[str, Optional[str]]]:
         """
         Определить ПО и его версию, используя всю доступную информацию
         
         Args:
-            file_path: Путь к файлу
+            file_path: Путь к файлу или FileRecord
             
         Returns:
             Кортеж (software_name, version) или None
         """
+        file_path = FileAnalyzer.make_record(file_path)
+        
         # Определи по пути
         detection = self.detect_software(file_path)
         if not detection:
@@ -489,6 +913,11 @@ class SoftwareDetector:
         """
         return extract_pe_version(file_path)
 
+    @staticmethod
+    def invalidate_registry_cache() -> None:
+        """Сбросить кэш установленного ПО из реестра (см. invalidate_registry_cache)"""
+        invalidate_registry_cache()
+
     def detect_from_registry(self, software_name: str) -> Optional[Dict[str, str]]:
         """
         Получить информацию о ПО из реестра Windows
@@ -502,15 +931,21 @@ class SoftwareDetector:
         if sys.platform != 'win32':
             return None
         
-        installed = get_installed_software_from_registry()
+        installed, lower_index, tokens = _registry_snapshot()
         
         # Ищи точное совпадение
         if software_name in installed:
             return installed[software_name]
         
-        # Ищи частичное совпадение (case-insensitive)
-        for name, info in installed.items():
-            if software_name.lower() in name.lower() or name.lower() in software_name.lower():
+        # Точное совпадение без учёта регистра
+        software_lower = software_name.lower()
+        info = lower_index.get(software_lower)
+        if info is not None:
+            return info
+        
+        # Ищи частичное совпадение (case-insensitive), начиная с длинных имён
+        for name_lower, info in tokens:
+            if software_lower in name_lower or name_lower in software_lower:
                 return info
         
         return None
@@ -2,13 +2,282 @@
 Сканер системных программ - автоматическое обнаружение установленного ПО
 """
 
+import json
 import os
 import platform
 import shutil
-from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+import stat
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, List, Dict, Tuple, Optional, Callable, Iterator
 import subprocess
 import re
+import threading
+
+
+# Количество потоков для параллельного обхода папок
+WALK_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+# Точки повторной обработки (junction) есть только на Windows: на остальных системах
+# проверка лишь добавила бы lstat на каждую папку
+_CHECK_REPARSE_POINTS = os.name == 'nt'
+
+# Служебные папки Windows: в них не заходим
+_WINDOWS_SKIP_DIRS = frozenset(('$Recycle.Bin', 'System Volume Information'))
+
+# Папки Linux/macOS без программ: в них не заходим
+_UNIX_SKIP_DIRS = frozenset(('__pycache__', 'debug', 'doc', 'locale', 'man'))
+
+# Кэш списка пакетов между запусками (сбрасывается при изменении базы пакетного менеджера)
+PACKAGE_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'cve_finder', 'packages.json')
+
+# Файлы базы пакетов: их mtime и размер - ключ кэша
+_PACKAGE_DATABASES = {
+    'dpkg': ('/var/lib/dpkg/status',),
+    'rpm': ('/var/lib/rpm/rpmdb.sqlite', '/var/lib/rpm/rpmdb.sqlite-wal', '/var/lib/rpm/Packages',
+            '/usr/lib/sysimage/rpm/rpmdb.sqlite', '/usr/lib/sysimage/rpm/rpmdb.sqlite-wal',
+            '/usr/lib/sysimage/rpm/Packages'),
+    'pacman': ('/var/lib/pacman/local',),
+    'apk': ('/lib/apk/db/installed',),
+}
+_PACKAGE_DATABASES['zypper'] = _PACKAGE_DATABASES['rpm']
+
+# Строка `apk info -v`: имя пакета и версия (package-name-1.2.3-r0)
+_APK_PACKAGE_RE = re.compile(r'^(.+?)-(\d+\..*)$')
+
+
+def _is_reparse_point(entry: os.DirEntry) -> bool:
+    """
+    Проверить, является ли папка точкой повторной обработки (junction, например
+    "C:\\ProgramData\\Application Data"), которая ведёт в уже обходимое дерево
+    На Windows атрибуты берутся из данных перечисления каталога, без системного вызова
+    """
+    if not _CHECK_REPARSE_POINTS:
+        return False
+    try:
+        attributes = entry.stat(follow_symlinks=False).st_file_attributes
+    except (OSError, AttributeError):
+        return False
+    return bool(attributes & stat.FILE_ATTRIBUTE_REPARSE_POINT)
+
+
+def _existing_unique_dirs(paths: List[str]) -> Iterator[str]:
+    """
+    Отобрать существующие корневые папки, ведущие в разные места
+    Папка, которая через символическую ссылку совпадает с уже выбранной
+    (например /usr/local/bin -> /usr/bin), пропускается: её файлы уже будут найдены
+    """
+    seen = set()
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        real_path = os.path.realpath(path)
+        if real_path in seen:
+            continue
+        seen.add(real_path)
+        yield path
+
+
+def _build_path_index() -> Dict[str, List[str]]:
+    """
+    Прочитать все папки из PATH один раз
+    
+    Returns:
+        Словарь {имя файла: [пути в порядке PATH]}
+    """
+    index = {}
+    seen = set()
+    for directory in (os.environ.get('PATH') or os.defpath).split(os.pathsep):
+        normalized = os.path.normcase(directory)
+        if normalized in seen:
+            continue
+        seen.add(normalized)
+        try:
+            with os.scandir(directory or os.curdir) as entries:
+                for entry in entries:
+                    index.setdefault(entry.name, []).append(os.path.join(directory, entry.name))
+        except OSError:
+            continue
+    return index
+
+
+def _which(name: str, path_index: Dict[str, List[str]]) -> Optional[str]:
+    """
+    Найти исполняемый файл по индексу PATH (как shutil.which, но без перебора папок PATH)
+    
+    Returns:
+        Путь к файлу или None
+    """
+    for path in path_index.get(name, ()):
+        if os.access(path, os.X_OK) and not os.path.isdir(path):
+            return path
+    return None
+
+
+def _iter_command_lines(args: List[str], timeout: float) -> Iterator[str]:
+    """
+    Запустить команду и отдавать строки её вывода по мере поступления
+    (разбор идёт одновременно с работой команды, весь вывод в памяти не копится)
+    
+    Args:
+        args: Команда и аргументы
+        timeout: Предельное время работы команды в секундах
+        
+    Raises:
+        subprocess.TimeoutExpired: Команда не завершилась за timeout
+        subprocess.CalledProcessError: Команда завершилась с ошибкой
+    """
+    process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    timed_out = threading.Event()
+    
+    def kill() -> None:
+        timed_out.set()
+        process.kill()
+    
+    timer = threading.Timer(timeout, kill)
+    timer.daemon = True
+    timer.start()
+    try:
+        yield from process.stdout
+        returncode = process.wait()
+    finally:
+        timer.cancel()
+        process.stdout.close()
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+    
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(args, timeout)
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, args)
+
+
+@lru_cache(maxsize=4096)
+def _cached_which(name: str) -> Optional[str]:
+    """
+    shutil.which с кэшем на процесс (PATH во время работы не меняется;
+    при необходимости кэш сбрасывается через _cached_which.cache_clear())
+    """
+    return shutil.which(name)
+
+
+def _package_cache_key(package_manager: str) -> Optional[List[Any]]:
+    """
+    Ключ кэша пакетов: состояние файлов базы пакетного менеджера и PATH
+    (от PATH зависят install_path)
+    
+    Returns:
+        Ключ или None, если база не найдена (тогда кэш не используется)
+    """
+    stamps = []
+    for path in _PACKAGE_DATABASES.get(package_manager, ()):
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            continue
+        stamps.append([path, stat_result.st_mtime_ns, stat_result.st_size])
+    if not stamps:
+        return None
+    return [package_manager, os.environ.get('PATH', ''), stamps]
+
+
+def _load_package_cache(key: List[Any]) -> Optional[List['InstalledPackage']]:
+    """
+    Прочитать список пакетов из кэша
+    
+    Returns:
+        Список пакетов или None, если кэша нет, он повреждён или ключ не совпал
+    """
+    try:
+        with open(PACKAGE_CACHE_PATH, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data['key'] != key:
+            return None
+        return [InstalledPackage(*item) for item in data['packages']]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _store_package_cache(key: List[Any], packages: List['InstalledPackage']) -> None:
+    """Сохранить список пакетов в кэш (атомарно: через временный файл и os.replace)"""
+    directory = os.path.dirname(PACKAGE_CACHE_PATH)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({
+                'key': key,
+                'packages': [[p.name, p.version, p.install_path] for p in packages],
+            }, f, ensure_ascii=False)
+        os.replace(temp_path, PACKAGE_CACHE_PATH)
+    except (OSError, ValueError):
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+
+
+def _list_directory(path: str, descend: bool,
+                    skip_dir: Callable[[str], bool],
+                    accept_file: Callable[[os.DirEntry], bool]) -> Tuple[List[str], List[str]]:
+    """
+    Прочитать одну папку
+    Символические ссылки и junction на папки не обходятся и не считаются файлами
+    
+    Args:
+        path: Папка
+        descend: Нужно ли возвращать подпапки для дальнейшего обхода
+        skip_dir: Нужно ли пропустить папку (по имени)
+        accept_file: Подходит ли файл (по записи os.scandir)
+        
+    Returns:
+        Кортеж (подходящие файлы, подпапки для обхода)
+    """
+    files = []
+    subdirs = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                
+                if is_dir:
+                    if (descend and not skip_dir(entry.name) and not entry.is_symlink()
+                            and not _is_reparse_point(entry)):
+                        subdirs.append(entry.path)
+                else:
+                    try:
+                        if accept_file(entry):
+                            files.append(entry.path)
+                    except OSError:
+                        pass
+    except OSError:
+        # Папка недоступна - пропускаем, как os.walk
+        pass
+    return files, subdirs
+
+
+@dataclass
+class InstalledPackage:
+    """Установленный пакет Linux (результат SystemScanner.get_installed_packages_linux)"""
+    __slots__ = ('name', 'version', 'install_path')
+
+    name: str  # Имя пакета
+    version: str  # Версия или 'unknown'
+    install_path: str  # Путь к исполняемому файлу пакета
+
+    def asdict(self) -> Dict[str, Any]:
+        """Преобразовать в словарь (для вывода в JSON)"""
+        return {name: getattr(self, name) for name in self.__slots__}
 
 
 class SystemScanner:
@@ -16,34 +285,72 @@ class SystemScanner:
     Сканирует систему и находит установленное ПО
     """
     
+    # Категории ПО для get_installed_software_info: (категория, ключевые слова в имени файла).
+    # Порядок важен: программа попадает в первую категорию, ключевое слово которой входит в имя
+    _CATEGORY_KEYWORDS = (
+        ('browsers', frozenset(('firefox', 'chrome', 'edge', 'opera', 'safari'))),
+        ('databases', frozenset(('mysql', 'postgres', 'mongodb', 'oracle'))),
+        ('webservers', frozenset(('apache', 'nginx', 'iis'))),
+        ('interpreters', frozenset(('python', 'java', 'node', 'php', 'ruby'))),
+    )
+    
+    # Ключевые слова каждой категории, собранные в одно регулярное выражение:
+    # один поиск на категорию вместо отдельной проверки in на каждое слово
+    _CATEGORY_PATTERNS = tuple(
+        (category, re.compile('|'.join(re.escape(keyword) for keyword in sorted(keywords))).search)
+        for category, keywords in _CATEGORY_KEYWORDS
+    )
+    
     def __init__(self):
         """Инициализация"""
         self.system = platform.system()  # 'Windows', 'Linux', 'Darwin'
         self.program_paths: List[str] = []
+        # Результат последнего scan_system (None - сканирования ещё не было)
+        self._scan_cache: Optional[List[str]] = None
+        # Сканер для каждой поддерживаемой системы
+        self._system_scanners: Dict[str, Callable[[], List[str]]] = {
+            'Windows': self._scan_windows,
+            'Linux': self._scan_linux,
+            'Darwin': self._scan_macos,
+        }
+        # Получение пакетов для каждого пакетного менеджера
+        self._package_readers: Dict[str, Callable[[], List[InstalledPackage]]] = {
+            'dpkg': self._get_packages_dpkg,
+            'rpm': self._get_packages_rpm,
+            'pacman': self._get_packages_pacman,
+            'zypper': self._get_packages_zypper,
+            'apk': self._get_packages_apk,
+        }
     
-    def scan_system(self) -> List[str]:
+    def scan_system(self, force: bool = False) -> List[str]:
         """
         Сканировать систему и получить пути ко всем исполняемым файлам
+        Результат запоминается в экземпляре: повторный вызов (в том числе из
+        get_installed_software_info) не обходит папки заново
+        
+        Args:
+            force: Пересканировать, даже если результат уже есть
         
         Returns:
             Список путей к программам
         """
+        if self._scan_cache is not None and not force:
+            return list(self._scan_cache)
+        
         print(f"Сканирование системы ({self.system})...")
         
-        if self.system == 'Windows':
-            return self._scan_windows()
-        elif self.system == 'Linux':
-            return self._scan_linux()
-        elif self.system == 'Darwin':
-            return self._scan_macos()
+        scanner = self._system_scanners.get(self.system)
+        if scanner is not None:
+            programs = scanner()
         else:
             print(f"⚠ Система {self.system} не поддерживается")
-            return []
+            programs = []
+        
+        self._scan_cache = programs
+        return list(programs)
     
     def _scan_windows(self) -> List[str]:
         """Сканирование Windows"""
-        programs = []
-        
         # Путями по умолчанию на Windows
         search_paths = [
             'C:\\Program Files',
@@ -52,28 +359,22 @@ class SystemScanner:
             'C:\\Windows\\System32',
         ]
         
-        for base_path in search_paths:
-            if os.path.exists(base_path):
-                print(f"  Сканирование {base_path}...")
-                for root, dirs, files in os.walk(base_path):
-                    # Ограничи глубину поиска
-                    if root.count(os.sep) - base_path.count(os.sep) > 3:
-                        continue
-                    
-                    for file in files:
-                        if file.lower().endswith('.exe'):
-                            full_path = os.path.join(root, file)
-                            programs.append(full_path)
-                    
-                    # Исключи некоторые папки
-                    dirs[:] = [d for d in dirs if d not in ['$Recycle.Bin', 'System Volume Information']]
+        base_paths = list(_existing_unique_dirs(search_paths))
+        for base_path in base_paths:
+            print(f"  Сканирование {base_path}...")
+        programs = self._walk_tree(
+            base_paths,
+            max_depth=3,  # Ограничи глубину поиска
+            # Исключи некоторые папки
+            skip_dir=_WINDOWS_SKIP_DIRS.__contains__,
+            accept_file=lambda entry: entry.name[-4:].lower() == '.exe',
+            limit=1000,  # Ограничь результаты для демонстрации
+        )
         
-        return programs[:1000]  # Ограничь результаты для демонстрации
+        return programs
     
     def _scan_linux(self) -> List[str]:
         """Сканирование Linux"""
-        programs = []
-        
         # Общие пути для Linux
         search_paths = [
             '/usr/bin',
@@ -82,27 +383,21 @@ class SystemScanner:
             '/usr/lib',
         ]
         
-        for base_path in search_paths:
-            if os.path.exists(base_path):
-                print(f"  Сканирование {base_path}...")
-                for root, dirs, files in os.walk(base_path):
-                    # Ограничь глубину
-                    if root.count(os.sep) - base_path.count(os.sep) > 2:
-                        continue
-                    
-                    for file in files:
-                        full_path = os.path.join(root, file)
-                        if os.path.isfile(full_path) and os.access(full_path, os.X_OK):
-                            programs.append(full_path)
-                    
-                    dirs[:] = [d for d in dirs if not d.startswith('.')]
+        base_paths = list(_existing_unique_dirs(search_paths))
+        for base_path in base_paths:
+            print(f"  Сканирование {base_path}...")
+        programs = self._walk_tree(
+            base_paths,
+            max_depth=2,  # Ограничь глубину
+            skip_dir=lambda name: name.startswith('.') or name in _UNIX_SKIP_DIRS,
+            accept_file=lambda entry: entry.is_file() and os.access(entry.path, os.X_OK),
+            limit=500,
+        )
         
-        return programs[:500]
+        return programs
     
     def _scan_macos(self) -> List[str]:
         """Сканирование macOS"""
-        programs = []
-        
         search_paths = [
             '/Applications',
             '/usr/local/bin',
@@ -110,21 +405,78 @@ class SystemScanner:
             '/opt/local/bin',
         ]
         
-        for base_path in search_paths:
-            if os.path.exists(base_path):
-                print(f"  Сканирование {base_path}...")
-                for root, dirs, files in os.walk(base_path):
-                    if root.count(os.sep) - base_path.count(os.sep) > 2:
-                        continue
-                    
-                    for file in files:
-                        full_path = os.path.join(root, file)
-                        if os.path.isfile(full_path):
-                            programs.append(full_path)
-                    
-                    dirs[:] = [d for d in dirs if not d.startswith('.')]
+        base_paths = list(_existing_unique_dirs(search_paths))
+        for base_path in base_paths:
+            print(f"  Сканирование {base_path}...")
+        programs = self._walk_tree(
+            base_paths,
+            max_depth=2,
+            skip_dir=lambda name: name.startswith('.') or name in _UNIX_SKIP_DIRS,
+            accept_file=lambda entry: entry.is_file(),
+            limit=500,
+        )
         
-        return programs[:500]
+        return programs
+    
+    def _walk_tree(self, base_paths: List[str], max_depth: int,
+                   skip_dir: Callable[[str], bool],
+                   accept_file: Callable[[os.DirEntry], bool],
+                   limit: Optional[int] = None) -> List[str]:
+        """
+        Обойти деревья папок параллельно (os.scandir в общем пуле потоков)
+        Чтение каталогов упирается в ввод-вывод, поэтому папки всех корней читаются одновременно;
+        результат собирается по корням в заданном порядке, внутри корня - как у os.walk
+        
+        Args:
+            base_paths: Корневые папки
+            max_depth: Максимальная глубина папок с файлами (0 - только сами корни)
+            skip_dir: Нужно ли пропустить папку (по имени)
+            accept_file: Подходит ли файл (по записи os.scandir)
+            limit: Максимальное число файлов (обход прекращается, как только
+                   первые limit файлов в порядке обхода известны)
+            
+        Returns:
+            Список путей к подходящим файлам
+        """
+        # Ключ - (номер корня, папка): вложенные друг в друга корни не смешиваются
+        listings = {}
+        result = []
+        # Папки, файлы которых ещё не добавлены в результат (вершина стека - следующая по порядку os.walk)
+        order = [(root, base_path) for root, base_path in enumerate(base_paths)]
+        order.reverse()
+        
+        with ThreadPoolExecutor(max_workers=WALK_WORKERS) as executor:
+            pending = {
+                executor.submit(_list_directory, base_path, max_depth > 0, skip_dir, accept_file): (root, base_path, 0)
+                for root, base_path in enumerate(base_paths)
+            }
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    root, path, depth = pending.pop(future)
+                    files, subdirs = future.result()
+                    listings[root, path] = (files, subdirs)
+                    for subdir in subdirs:
+                        future = executor.submit(_list_directory, subdir, depth + 1 < max_depth,
+                                                 skip_dir, accept_file)
+                        pending[future] = (root, subdir, depth + 1)
+                
+                # Добавь в результат файлы всех папок, прочитанных подряд в порядке обхода
+                while order and order[-1] in listings:
+                    root, path = order.pop()
+                    files, subdirs = listings.pop((root, path))
+                    result.extend(files)
+                    order.extend((root, subdir) for subdir in reversed(subdirs))
+                
+                if limit is not None and len(result) >= limit:
+                    # Первые limit файлов известны - остальные папки не читаем
+                    for future in pending:
+                        future.cancel()
+                    break
+        
+        if limit is not None:
+            del result[limit:]
+        return result
     
     def get_installed_software_info(self) -> Dict[str, List[str]]:
         """
@@ -144,30 +496,26 @@ class SystemScanner:
         programs = self.scan_system()
         
         for program in programs:
-            name_lower = Path(program).name.lower()
+            name_lower = os.path.basename(program).lower()
             
             # Классификация
-            if any(x in name_lower for x in ['firefox', 'chrome', 'edge', 'opera', 'safari']):
-                info['browsers'].append(program)
-            elif any(x in name_lower for x in ['mysql', 'postgres', 'mongodb', 'oracle']):
-                info['databases'].append(program)
-            elif any(x in name_lower for x in ['apache', 'nginx', 'iis']):
-                info['webservers'].append(program)
-            elif any(x in name_lower for x in ['python', 'java', 'node', 'php', 'ruby']):
-                info['interpreters'].append(program)
+            for category, search in self._CATEGORY_PATTERNS:
+                if search(name_lower):
+                    info[category].append(program)
+                    break
             else:
                 info['other'].append(program)
         
         return info
     
-    def get_installed_packages_linux(self) -> List[Dict[str, str]]:
+    def get_installed_packages_linux(self) -> List[InstalledPackage]:
         """
         Получить список установленных пакетов Linux с версиями.
         Поддерживает: dpkg (Debian/Ubuntu), rpm (RHEL/CentOS/Fedora), 
         pacman (Arch), zypper (openSUSE), apk (Alpine)
         
         Returns:
-            Список словарей: [{'name': 'package_name', 'version': '1.2.3', 'install_path': '/usr/bin/...'}, ...]
+            Список InstalledPackage (name, version, install_path)
         """
         packages = []
         package_manager = self._detect_package_manager()
@@ -178,20 +526,22 @@ class SystemScanner:
         
         print(f"  📦 Пакетный менеджер: {package_manager}")
         
+        # База пакетов не менялась с прошлого запуска - список берётся из кэша
+        cache_key = _package_cache_key(package_manager)
+        if cache_key is not None:
+            cached = _load_package_cache(cache_key)
+            if cached is not None:
+                print(f"  📦 Список пакетов из кэша: {PACKAGE_CACHE_PATH}")
+                return cached
+        
         try:
-            if package_manager == "dpkg":
-                packages = self._get_packages_dpkg()
-            elif package_manager == "rpm":
-                packages = self._get_packages_rpm()
-            elif package_manager == "pacman":
-                packages = self._get_packages_pacman()
-            elif package_manager == "zypper":
-                packages = self._get_packages_zypper()
-            elif package_manager == "apk":
-                packages = self._get_packages_apk()
+            packages = self._package_readers[package_manager]()
         except Exception as e:
             print(f"  ⚠️  Ошибка получения списка пакетов: {e}")
         
+        if packages and cache_key is not None:
+            _store_package_cache(cache_key, packages)
+        
         return packages
     
     def _detect_package_manager(self) -> Optional[str]:
@@ -206,143 +556,128 @@ class SystemScanner:
         ]
         
         for cmd, name in managers:
-            if shutil.which(cmd):
+            if _cached_which(cmd):
                 return name
         
         return None
     
-    def _get_packages_dpkg(self) -> List[Dict[str, str]]:
+    def _get_packages_dpkg(self) -> List[InstalledPackage]:
         """Получить пакеты через dpkg (Debian/Ubuntu)"""
         packages = []
+        # Папки PATH читаются один раз, а не shutil.which на каждый пакет
+        path_index = _build_path_index()
         try:
-            output = subprocess.check_output(
-                ["dpkg-query", "-W", "-f=${Package} ${Version}\n"],
-                text=True,
-                stderr=subprocess.DEVNULL,
-                timeout=120
-            )
-            for line in output.splitlines():
-                line = line.strip()
-                if not line:
+            for line in _iter_command_lines(["dpkg-query", "-W", "-f=${Package} ${Version}\n"], timeout=120):
+                # Формат: "name version" (одно разбиение вместо strip + split + проверки длины)
+                pkg_name, separator, pkg_version = line.strip().partition(' ')
+                if not pkg_name:
                     continue
-                parts = line.split(' ', 1)
-                pkg_name = parts[0]
-                pkg_version = parts[1] if len(parts) > 1 else 'unknown'
-                packages.append({
-                    'name': pkg_name,
-                    'version': pkg_version,
-                    'install_path': shutil.which(pkg_name) or f'/usr/bin/{pkg_name}'
-                })
+                if not separator:
+                    pkg_version = 'unknown'
+                packages.append(InstalledPackage(
+                    pkg_name, pkg_version,
+                    _which(pkg_name, path_index) or f'/usr/bin/{pkg_name}'
+                ))
         except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError) as e:
             print(f"  ⚠️  Ошибка dpkg-query: {e}")
+            # Вывод прерванной команды неполон - такой список не возвращаем
+            packages = []
         return packages
     
-    def _get_packages_rpm(self) -> List[Dict[str, str]]:
+    def _get_packages_rpm(self) -> List[InstalledPackage]:
         """Получить пакеты через rpm (RHEL/CentOS/Fedora)"""
         packages = []
+        # Папки PATH читаются один раз, а не shutil.which на каждый пакет
+        path_index = _build_path_index()
         try:
-            output = subprocess.check_output(
-                ["rpm", "-qa", "--queryformat", "%{NAME} %{VERSION}\n"],
-                text=True,
-                stderr=subprocess.DEVNULL,
-                timeout=120
-            )
-            for line in output.splitlines():
-                line = line.strip()
-                if not line:
+            for line in _iter_command_lines(["rpm", "-qa", "--queryformat", "%{NAME} %{VERSION}\n"], timeout=120):
+                # Формат: "name version" (одно разбиение вместо strip + split + проверки длины)
+                pkg_name, separator, pkg_version = line.strip().partition(' ')
+                if not pkg_name:
                     continue
-                parts = line.split(' ', 1)
-                pkg_name = parts[0]
-                pkg_version = parts[1] if len(parts) > 1 else 'unknown'
-                packages.append({
-                    'name': pkg_name,
-                    'version': pkg_version,
-                    'install_path': shutil.which(pkg_name) or f'/usr/bin/{pkg_name}'
-                })
+                if not separator:
+                    pkg_version = 'unknown'
+                packages.append(InstalledPackage(
+                    pkg_name, pkg_version,
+                    _which(pkg_name, path_index) or f'/usr/bin/{pkg_name}'
+                ))
         except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError) as e:
             print(f"  ⚠️  Ошибка rpm: {e}")
+            # Вывод прерванной команды неполон - такой список не возвращаем
+            packages = []
         return packages
     
-    def _get_packages_pacman(self) -> List[Dict[str, str]]:
+    def _get_packages_pacman(self) -> List[InstalledPackage]:
         """Получить пакеты через pacman (Arch Linux, Manjaro)"""
         packages = []
+        # Папки PATH читаются один раз, а не shutil.which на каждый пакет
+        path_index = _build_path_index()
         try:
-            output = subprocess.check_output(
-                ["pacman", "-Q"],
-                text=True,
-                stderr=subprocess.DEVNULL,
-                timeout=60
-            )
-            for line in output.splitlines():
-                line = line.strip()
-                if not line:
+            for line in _iter_command_lines(["pacman", "-Q"], timeout=60):
+                # Формат: "name version" (одно разбиение вместо strip + split + проверки длины)
+                pkg_name, separator, pkg_version = line.strip().partition(' ')
+                if not pkg_name:
                     continue
-                parts = line.split(' ', 1)
-                pkg_name = parts[0]
-                pkg_version = parts[1] if len(parts) > 1 else 'unknown'
-                packages.append({
-                    'name': pkg_name,
-                    'version': pkg_version,
-                    'install_path': shutil.which(pkg_name) or f'/usr/bin/{pkg_name}'
-                })
+                if not separator:
+                    pkg_version = 'unknown'
+                packages.append(InstalledPackage(
+                    pkg_name, pkg_version,
+                    _which(pkg_name, path_index) or f'/usr/bin/{pkg_name}'
+                ))
         except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError) as e:
             print(f"  ⚠️  Ошибка pacman: {e}")
+            # Вывод прерванной команды неполон - такой список не возвращаем
+            packages = []
         return packages
     
-    def _get_packages_zypper(self) -> List[Dict[str, str]]:
+    def _get_packages_zypper(self) -> List[InstalledPackage]:
         """Получить пакеты через zypper (openSUSE)"""
         packages = []
+        # Папки PATH читаются один раз, а не shutil.which на каждый пакет
+        path_index = _build_path_index()
         try:
-            output = subprocess.check_output(
-                ["rpm", "-qa", "--queryformat", "%{NAME} %{VERSION}\n"],
-                text=True,
-                stderr=subprocess.DEVNULL,
-                timeout=120
-            )
-            for line in output.splitlines():
-                line = line.strip()
-                if not line:
+            for line in _iter_command_lines(["rpm", "-qa", "--queryformat", "%{NAME} %{VERSION}\n"], timeout=120):
+                # Формат: "name version" (одно разбиение вместо strip + split + проверки длины)
+                pkg_name, separator, pkg_version = line.strip().partition(' ')
+                if not pkg_name:
                     continue
-                parts = line.split(' ', 1)
-                pkg_name = parts[0]
-                pkg_version = parts[1] if len(parts) > 1 else 'unknown'
-                packages.append({
-                    'name': pkg_name,
-                    'version': pkg_version,
-                    'install_path': shutil.which(pkg_name) or f'/usr/bin/{pkg_name}'
-                })
+                if not separator:
+                    pkg_version = 'unknown'
+                packages.append(InstalledPackage(
+                    pkg_name, pkg_version,
+                    _which(pkg_name, path_index) or f'/usr/bin/{pkg_name}'
+                ))
         except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError) as e:
             print(f"  ⚠️  Ошибка zypper/rpm: {e}")
+            # Вывод прерванной команды неполон - такой список не возвращаем
+            packages = []
         return packages
     
-    def _get_packages_apk(self) -> List[Dict[str, str]]:
+    def _get_packages_apk(self) -> List[InstalledPackage]:
         """Получить пакеты через apk (Alpine Linux)"""
         packages = []
+        # Папки PATH читаются один раз, а не shutil.which на каждый пакет
+        path_index = _build_path_index()
         try:
-            output = subprocess.check_output(
-                ["apk", "info", "-v"],
-                text=True,
-                stderr=subprocess.DEVNULL,
-                timeout=60
-            )
-            for line in output.splitlines():
+            for line in _iter_command_lines(["apk", "info", "-v"], timeout=60):
                 line = line.strip()
                 if not line:
                     continue
                 # Формат: package-name-1.2.3-r0
                 # Нужно разделить имя и версию
-                match = re.match(r'^(.+?)-(\d+\..*)$', line)
+                match = _APK_PACKAGE_RE.match(line)
                 if match:
                     pkg_name = match.group(1)
                     pkg_version = match.group(2)
                 else:
                     pkg_name = line
                     pkg_version = 'unknown'
-                packages.append({
-                    'name': pkg_name,
-                    'version': pkg_version,
-                    'install_path': shutil.which(pkg_name) or f'/usr/bin/{pkg_name}'
-                })
+                packages.append(InstalledPackage(
+                    pkg_name, pkg_version,
+                    _which(pkg_name, path_index) or f'/usr/bin/{pkg_name}'
+                ))
         except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError) as e:
             print(f"  ⚠️  Ошибка apk: {e}")
+            # Вывод прерванной команды неполон - такой список не возвращаем
+            packages = []
         return packages
@@ -2,14 +2,33 @@
 Парсер для загрузки данных из БДУ ФСТЕК (full_data.xlsx)
 """
 
+import openpyxl
 import pandas as pd
 import re
+import sys
 from pathlib import Path
-from typing import Optional, Dict, List, Tuple
+from typing import Any, Optional, Dict, Iterator, List, Sequence, Tuple
 from enum import Enum
 
 from ..core.data_structures import Vulnerability, SeverityLevel, VulnerabilityTree
 
+# Необязательное быстрое чтение xlsx (если не установлен - лист читается через openpyxl)
+try:
+    import python_calamine
+except ImportError:
+    python_calamine = None
+
+
+# Версия формата кеша таблицы: увеличивается при изменении набора загружаемых столбцов
+DATA_CACHE_VERSION = 1
+
+# Идентификаторы CVE и CWE в текстовых полях БДУ
+_CVE_RE = re.compile(r'CVE-\d{4}-\d+')
+_CWE_RE = re.compile(r'CWE-\d+')
+
+# Сколько ошибок разбора строк выводится подробно (остальные только подсчитываются)
+MAX_REPORTED_PARSE_ERRORS = 5
+
 
 class BDUParser:
     """
@@ -29,15 +48,49 @@ class BDUParser:
         'low': SeverityLevel.LOW,
     }
 
-    def __init__(self, file_path: str):
+    # Столбцы, которые разбирает parse_row (в порядке аргументов _parse_values)
+    _ROW_COLUMNS = (
+        'Идентификатор',
+        'Название ПО',
+        'Версия ПО',
+        'Идентификаторы других систем описаний уязвимости',
+        'Наименование уязвимости',
+        'Описание уязвимости',
+        'Уровень опасности уязвимости',
+        'CVSS 2.0',
+        'CVSS 3.0',
+        'CVSS 4.0',
+        'Класс уязвимости',
+        'Тип ошибки CWE',
+        'Описание ошибки CWE',
+        'Дата публикации',
+        'Наличие эксплойта',
+        'Возможные меры по устранению',
+        'Способ устранения',
+        'Статус уязвимости',
+    )
+
+    # Все столбцы, которые нужны парсеру (остальные при загрузке не читаются)
+    _LOADED_COLUMNS = frozenset(_ROW_COLUMNS + ('Вендор ПО', 'Тип ПО'))
+
+    def __init__(self, file_path: str, use_cache: bool = True):
         """
         Инициализация парсера
         
         Args:
             file_path: Путь к файлу full_data.xlsx
+            use_cache: Читать таблицу из кеша рядом с Excel файлом (и создавать его)
         """
         self.file_path = Path(file_path)
+        self.use_cache = use_cache
         self.df = None
+        # Пул для длинных повторяющихся строк (описания CWE, статусы):
+        # одинаковые значения хранятся в дереве одним объектом
+        self._string_pool: Dict[str, str] = {}
+        # Уровень опасности по тексту ячейки: различных текстов в БДУ в десятки раз меньше, чем строк
+        self._severity_cache: Dict[str, SeverityLevel] = {}
+        # Количество строк, разбор которых завершился ошибкой
+        self.parse_errors = 0
         self._load_data()
 
     def _load_data(self) -> None:
@@ -45,10 +98,107 @@ class BDUParser:
         if not self.file_path.exists():
             raise FileNotFoundError(f"Файл {self.file_path} не найден")
 
-        print(f"Загрузка данных из {self.file_path}...")
-        self.df = pd.read_excel(self.file_path, header=2)  # Заголовки в строке 3 (индекс 2)
+        # Разбор Excel (XML) в десятки раз медленнее чтения сохранённой таблицы:
+        # таблица кешируется, пока Excel файл не изменится
+        cache_path = self._get_data_cache_path()
+        if self.use_cache and self._is_data_cache_fresh(cache_path):
+            print(f"Загрузка данных из кеша: {cache_path}")
+            try:
+                self.df = pd.read_pickle(cache_path)
+            except Exception as e:
+                # Кеш повреждён или сохранён несовместимой версией pandas
+                print(f"⚠ Кеш данных не прочитан ({e}), загрузка из Excel")
+                self.df = None
+
+        if self.df is None:
+            print(f"Загрузка данных из {self.file_path}...")
+            self.df = self._read_excel()
+            if self.use_cache:
+                self._save_data_cache(cache_path)
         print(f"✓ Загружено {len(self.df)} уязвимостей")
 
+    def _iter_sheet_rows(self) -> Iterator[Sequence[Any]]:
+        """
+        Перебрать строки первого листа как последовательности значений
+        Используется python-calamine (разбор xlsx на Rust), иначе openpyxl в режиме read_only
+        """
+        if python_calamine is not None:
+            workbook = python_calamine.CalamineWorkbook.from_path(str(self.file_path))
+            try:
+                sheet = workbook.get_sheet_by_index(0)
+                # Диапазон calamine начинается с первой непустой ячейки: смещение восстанавливается
+                start_row, start_col = sheet.start
+                padding = [None] * start_col
+                for _ in range(start_row):
+                    yield ()
+                for row in sheet.iter_rows():
+                    yield padding + row if padding else row
+            finally:
+                workbook.close()
+        else:
+            workbook = openpyxl.load_workbook(self.file_path, read_only=True, data_only=True)
+            try:
+                yield from workbook.worksheets[0].iter_rows(values_only=True)
+            finally:
+                workbook.close()
+
+    def _read_excel(self) -> pd.DataFrame:
+        """
+        Прочитать нужные столбцы листа потоково
+        Значения сразу раскладываются по спискам столбцов: остальные столбцы
+        не попадают в память, а таблица строится одним вызовом без разбора типов
+
+        Returns:
+            DataFrame с object-столбцами (пустые ячейки - NaN, как у pd.read_excel)
+        """
+        rows = self._iter_sheet_rows()
+        for _ in range(2):  # Заголовки в строке 3
+            next(rows, None)
+        header = tuple(next(rows, ()))
+        # Только нужные столбцы; при повторе названия берётся первый столбец
+        # (отсутствующий в файле столбец не вызывает ошибку)
+        positions = [i for i, name in enumerate(header)
+                     if name in self._LOADED_COLUMNS and name not in header[:i]]
+        columns: List[list] = [[] for _ in positions]
+        for row in rows:
+            width = len(row)
+            for values, i in zip(columns, positions):
+                value = row[i] if i < width else None
+                values.append(float('nan') if value is None or value == '' else value)
+
+        # Пустые строки в конце листа отбрасываются (как у pd.read_excel)
+        while columns and columns[0] and all(
+                isinstance(values[-1], float) and values[-1] != values[-1] for values in columns):
+            for values in columns:
+                values.pop()
+
+        return pd.DataFrame({header[i]: pd.Series(values, dtype=object)
+                             for i, values in zip(positions, columns)})
+
+    def _get_data_cache_path(self) -> Path:
+        """Получить путь до кеша таблицы (рядом с Excel файлом)"""
+        return self.file_path.with_suffix(f"{self.file_path.suffix}.v{DATA_CACHE_VERSION}.cache")
+
+    def _is_data_cache_fresh(self, cache_path: Path) -> bool:
+        """Проверить, что кеш таблицы есть и создан после последнего изменения Excel файла"""
+        try:
+            return cache_path.stat().st_mtime_ns >= self.file_path.stat().st_mtime_ns
+        except OSError:
+            return False
+
+    def _save_data_cache(self, cache_path: Path) -> None:
+        """Сохранить таблицу в кеш (ошибки записи не мешают работе)"""
+        temp_path = cache_path.with_name(cache_path.name + '.tmp')
+        try:
+            self.df.to_pickle(temp_path)
+            temp_path.replace(cache_path)
+        except Exception as e:
+            print(f"⚠ Кеш данных не сохранён: {e}")
+            try:
+                temp_path.unlink()
+            except OSError:
+                pass
+
     def _parse_severity(self, severity_text: Optional[str]) -> SeverityLevel:
         """
         Парсить уровень опасности из текста
@@ -62,6 +212,13 @@ class BDUParser:
         if not severity_text or not isinstance(severity_text, str):
             return SeverityLevel.UNKNOWN
 
+        level = self._severity_cache.get(severity_text)
+        if level is None:
+            level = self._severity_cache[severity_text] = self._match_severity(severity_text)
+        return level
+
+    def _match_severity(self, severity_text: str) -> SeverityLevel:
+        """Найти уровень опасности по началу текста"""
         text_lower = severity_text.lower()
         
         # Проверь начало текста
@@ -71,6 +228,10 @@ class BDUParser:
 
         return SeverityLevel.UNKNOWN
 
+    def _pooled(self, value: str) -> str:
+        """Вернуть общий экземпляр строки из пула"""
+        return self._string_pool.setdefault(value, value)
+
     def _extract_cve_id(self, cve_field: Optional[str]) -> Optional[str]:
         """
         Извлечь CVE ID из поля
@@ -85,7 +246,7 @@ class BDUParser:
             return None
 
         # Ищи CVE-XXXX-XXXXX
-        match = re.search(r'CVE-\d{4}-\d+', cve_field)
+        match = _CVE_RE.search(cve_field)
         return match.group(0) if match else None
 
     def _extract_cwe_id(self, cwe_field: Optional[str]) -> Optional[str]:
@@ -102,8 +263,8 @@ class BDUParser:
             return None
 
         # Ищи CWE-XXXXX
-        match = re.search(r'CWE-\d+', cwe_field)
-        return match.group(0) if match else None
+        match = _CWE_RE.search(cwe_field)
+        return sys.intern(match.group(0)) if match else None
 
     def _parse_cvss_score(self, score_str: Optional[str]) -> Optional[float]:
         """
@@ -134,53 +295,75 @@ class BDUParser:
         Парсить одну строку из DataFrame
         
         Args:
-            row: Строка DataFrame
+            row: Строка DataFrame (или словарь {столбец: значение})
             
+        Returns:
+            Кортеж (software_name, version_str, Vulnerability) или None
+        """
+        return self._parse_values(*(row.get(column, '') for column in self._ROW_COLUMNS))
+
+    def _parse_values(self, bdu_id, software_name, version_str, cve_field, name, description,
+                      severity, cvss_2_0, cvss_3_0, cvss_4_0, vulnerability_class, cwe_field,
+                      cwe_description, published_date, exploit, recommendations, remediation,
+                      status) -> Optional[Tuple[str, str, Vulnerability]]:
+        """
+        Парсить значения одной строки (аргументы - ячейки столбцов _ROW_COLUMNS по порядку)
+        
         Returns:
             Кортеж (software_name, version_str, Vulnerability) или None
         """
         try:
             # Получи основные поля
-            bdu_id = str(row.get('Идентификатор', '')).strip()
+            bdu_id = str(bdu_id).strip()
             if not bdu_id or bdu_id == 'nan':
                 return None
 
-            software_name = str(row.get('Название ПО', '')).strip()
+            software_name = str(software_name).strip()
             if not software_name or software_name == 'nan':
                 return None
 
-            version_str = str(row.get('Версия ПО', '')).strip()
+            version_str = str(version_str).strip()
             if not version_str or version_str == 'nan':
                 version_str = 'unknown'
 
             # Создай объект Vulnerability
             vulnerability = Vulnerability(
                 bdu_id=bdu_id,
-                cve_id=self._extract_cve_id(row.get('Идентификаторы других систем описаний уязвимости')),
-                name=str(row.get('Наименование уязвимости', '')).strip(),
-                description=str(row.get('Описание уязвимости', '')).strip(),
-                severity=self._parse_severity(row.get('Уровень опасности уязвимости')),
-                cvss_2_0=self._parse_cvss_score(row.get('CVSS 2.0')),
-                cvss_3_0=self._parse_cvss_score(row.get('CVSS 3.0')),
-                cvss_4_0=self._parse_cvss_score(row.get('CVSS 4.0')),
-                vulnerability_class=str(row.get('Класс уязвимости', '')).strip(),
-                cwe_id=self._extract_cwe_id(row.get('Тип ошибки CWE')),
-                cwe_description=str(row.get('Описание ошибки CWE', '')).strip(),
-                published_date=str(row.get('Дата публикации', '')).strip(),
-                exploit_available='Существует' in str(row.get('Наличие эксплойта', '')),
+                cve_id=self._extract_cve_id(cve_field),
+                name=str(name).strip(),
+                description=str(description).strip(),
+                severity=self._parse_severity(severity),
+                cvss_2_0=self._parse_cvss_score(cvss_2_0),
+                cvss_3_0=self._parse_cvss_score(cvss_3_0),
+                cvss_4_0=self._parse_cvss_score(cvss_4_0),
+                vulnerability_class=sys.intern(str(vulnerability_class).strip()),
+                cwe_id=self._extract_cwe_id(cwe_field),
+                cwe_description=self._pooled(str(cwe_description).strip()),
+                published_date=sys.intern(str(published_date).strip()),
+                exploit_available='Существует' in str(exploit),
+                recommendations=str(recommendations).strip(),
+                remediation=str(remediation).strip(),
+                status=self._pooled(str(status).strip()),
             )
-            
-            # Добавь рекомендации в additional_info
-            vulnerability.additional_info['recommendations'] = str(row.get('Возможные меры по устранению', '')).strip()
-            vulnerability.additional_info['remediation'] = str(row.get('Способ устранения', '')).strip()
-            vulnerability.additional_info['status'] = str(row.get('Статус уязвимости', '')).strip()
 
             return (software_name, version_str, vulnerability)
 
         except Exception as e:
-            print(f"⚠ Ошибка парсинга строки {bdu_id}: {e}")
+            # На «грязном» файле ошибок могут быть тысячи: подробно выводятся только первые
+            self.parse_errors += 1
+            if self.parse_errors <= MAX_REPORTED_PARSE_ERRORS:
+                print(f"⚠ Ошибка парсинга строки {bdu_id}: {e}")
             return None
 
+    def _column_values(self, column: str) -> Sequence[Any]:
+        """
+        Значения столбца одним массивом Python-объектов
+        (для отсутствующего столбца - пустые строки, как row.get(column, ''))
+        """
+        if column in self.df.columns:
+            return self.df[column].to_numpy(dtype=object)
+        return [''] * len(self.df)
+
     def build_tree(self) -> VulnerabilityTree:
         """
         Построить дерево уязвимостей из данных
@@ -194,12 +377,18 @@ class BDUParser:
         processed = 0
         skipped = 0
 
-        for idx, row in self.df.iterrows():
-            result = self.parse_row(row)
+        # Столбцы извлекаются целиком один раз: строки перебираются как кортежи значений,
+        # без создания pd.Series на каждую строку (как делает iterrows)
+        rows = zip(*(self._column_values(column) for column in self._ROW_COLUMNS))
+        vendors = self._column_values('Вендор ПО')
+        software_types = self._column_values('Тип ПО')
+
+        for idx, (values, vendor, software_type) in enumerate(zip(rows, vendors, software_types)):
+            result = self._parse_values(*values)
             if result:
                 software_name, version_str, vulnerability = result
-                vendor = str(row.get('Вендор ПО', '')).strip()
-                software_type = str(row.get('Тип ПО', '')).strip()
+                vendor = sys.intern(str(vendor).strip())
+                software_type = sys.intern(str(software_type).strip())
 
                 tree.add_vulnerability(
                     software_name=software_name,
@@ -217,6 +406,8 @@ class BDUParser:
                 print(f"  Обработано {idx + 1}/{len(self.df)} строк...")
 
         print(f"✓ Дерево построено: {processed} уязвимостей добавлено, {skipped} пропущено")
+        if self.parse_errors:
+            print(f"⚠ Строк с ошибками разбора: {self.parse_errors}")
         
         stats = tree.get_statistics()
         print(f"  • ПО в базе: {stats['total_software']:,}")
@@ -2,7 +2,6 @@
 Загрузчик данных - интегрирует парсеры и управляет деревом уязвимостей
 """
 
-import json
 import pickle
 from pathlib import Path
 from typing import Optional
@@ -10,6 +9,19 @@ from typing import Optional
 from .bdu_parser import BDUParser
 from ..core.data_structures import VulnerabilityTree
 
+# Необязательное сжатие кеша дерева (если не установлен - кеш пишется без сжатия)
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Версия формата кеша: увеличивается при изменении структур дерева,
+# чтобы не загружать несовместимые pickle-файлы прошлых версий
+CACHE_FORMAT_VERSION = 5
+
+# Уровень сжатия zstandard для кеша дерева
+CACHE_COMPRESSION_LEVEL = 3
+
 
 class DataLoader:
     """
@@ -29,8 +41,9 @@ class DataLoader:
         self.tree: Optional[VulnerabilityTree] = None
 
     def _get_cache_path(self, source: str) -> Path:
-        """Получить путь до файла кеша"""
-        return self.cache_dir / f"tree_{source}.cache"
+        """Получить путь до файла кеша (сжатый кеш получает суффикс .zst)"""
+        suffix = ".zst" if zstandard is not None else ""
+        return self.cache_dir / f"tree_{source}.v{CACHE_FORMAT_VERSION}.cache{suffix}"
 
     def load_bdu(self, file_path: str, use_cache: bool = True) -> VulnerabilityTree:
         """
@@ -49,20 +62,29 @@ class DataLoader:
         if use_cache and cache_path.exists():
             print(f"Загрузка дерева из кеша: {cache_path}")
             with open(cache_path, 'rb') as f:
-                self.tree = pickle.load(f)
+                if zstandard is not None:
+                    with zstandard.ZstdDecompressor().stream_reader(f) as reader:
+                        self.tree = pickle.load(reader)
+                else:
+                    self.tree = pickle.load(f)
             print("✓ Дерево загружено из кеша")
             return self.tree
 
         # Парсь данные
         print(f"Парсинг БДУ данных из {file_path}...")
-        parser = BDUParser(file_path)
+        parser = BDUParser(file_path, use_cache=use_cache)
         self.tree = parser.build_tree()
 
         # Сохрани кеш
         if use_cache:
             print(f"Сохранение кеша: {cache_path}")
             with open(cache_path, 'wb') as f:
-                pickle.dump(self.tree, f)
+                if zstandard is not None:
+                    compressor = zstandard.ZstdCompressor(level=CACHE_COMPRESSION_LEVEL)
+                    with compressor.stream_writer(f) as writer:
+                        pickle.dump(self.tree, writer, protocol=pickle.HIGHEST_PROTOCOL)
+                else:
+                    pickle.dump(self.tree, f, protocol=pickle.HIGHEST_PROTOCOL)
             print("✓ Кеш сохранён")
 
         return self.tree
@@ -90,5 +112,6 @@ class DataLoader:
 
         print(f"Сохранение дерева в JSON: {output_path}")
         with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(self.tree.to_dict(), f, ensure_ascii=False, indent=2)
+            for chunk in self.tree.iter_json_chunks(indent=2):
+                f.write(chunk)
         print(f"✓ JSON сохранён ({output_path})")
@@ -12,6 +12,8 @@ from ..detectors.software_detector import SoftwareDetector
 
 class VulnerabilityFinding:
     """Результат проверки файла на уязвимости"""
+    # Находок столько же, сколько проверенных файлов: без __dict__ каждая занимает меньше памяти
+    __slots__ = ('file_path', 'software_name', 'software_version', 'vulnerabilities')
     
     def __init__(self, file_path: str, software_name: Optional[str] = None, 
                  software_version: Optional[str] = None, vulnerabilities: List[Vulnerability] = None):
@@ -67,12 +69,15 @@ class FileScanner:
         if not path.exists():
             return None
         
+        # Путь разбирается один раз для всех проверок
+        record = self.file_analyzer.make_record(file_path)
+        
         # Проверь, нужно ли игнорировать файл
-        if self.file_analyzer.is_safe_to_ignore(file_path):
+        if self.file_analyzer.is_safe_to_ignore(record):
             return None
         
         # Проверь, исполняемый ли файл
-        if not self.file_analyzer.is_executable(file_path):
+        if not self.file_analyzer.is_executable(record):
             return None
         
         # Определи ПО и версию
@@ -80,14 +85,14 @@ class FileScanner:
         software_name = None
         software_version = None
         
-        if file_path.lower().endswith('.exe'):
+        if record.suffix == '.exe':
             pe_result = self.detector.detect_from_pe_metadata(file_path)
             if pe_result:
                 software_name, software_version = pe_result
         
         # Приоритет 2: Если не получилось из PE, определи по пути
         if not software_name:
-            detection = self.detector.detect_from_file(file_path)
+            detection = self.detector.detect_from_file(record)
             if detection:
                 software_name, software_version = detection
         
@@ -115,3 +120,36 @@ class FileScanner:
                 for v in sw.versions.values()
             ),
         }
+
+
+# Сканер процесса пула (создаётся в init_worker_scanner)
+_worker_scanner: Optional[FileScanner] = None
+
+
+def init_worker_scanner(vulnerability_tree: VulnerabilityTree) -> None:
+    """
+    Инициализатор процесса для ProcessPoolExecutor
+    Дерево передаётся (pickle) один раз на процесс, а не на каждый файл
+    
+    Args:
+        vulnerability_tree: Дерево уязвимостей
+    """
+    global _worker_scanner
+    _worker_scanner = FileScanner(vulnerability_tree)
+
+
+def scan_file_in_worker(file_path: str, keep_errors: bool = False) -> Optional[VulnerabilityFinding]:
+    """
+    Сканировать файл в процессе пула (см. init_worker_scanner)
+    
+    Args:
+        file_path: Путь к файлу
+        keep_errors: При ошибке вернуть запись о файле без ПО вместо None
+    
+    Returns:
+        VulnerabilityFinding или None (в том числе при ошибке, если keep_errors=False)
+    """
+    try:
+        return _worker_scanner.scan_file(file_path)
+    except Exception:
+        return VulnerabilityFinding(file_path=file_path) if keep_errors else None
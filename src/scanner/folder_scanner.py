@@ -3,12 +3,24 @@
 """
 
 import os
+import re
+import sys
+from functools import partial
 from pathlib import Path
 from typing import List, Optional, Callable
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 from ..core.data_structures import VulnerabilityTree
-from .file_scanner import FileScanner, VulnerabilityFinding
+from .file_scanner import FileScanner, VulnerabilityFinding, init_worker_scanner, scan_file_in_worker
+
+
+# Пул процессов включается явно (use_processes) и только начиная с этого количества файлов.
+# Каждый процесс получает свою копию дерева: при запуске через spawn (Windows) это
+# секунды на процесс, поэтому по умолчанию и на меньших папках используется пул потоков
+PROCESS_POOL_MIN_FILES = 500
+
+# ProcessPoolExecutor на Windows не принимает больше 61 процесса
+WINDOWS_MAX_PROCESS_WORKERS = 61
 
 
 class FolderScanner:
@@ -17,16 +29,19 @@ class FolderScanner:
     Поддерживает параллельную обработку файлов
     """
     
-    def __init__(self, vulnerability_tree: VulnerabilityTree, max_workers: int = 4):
+    def __init__(self, vulnerability_tree: VulnerabilityTree, max_workers: int = 4,
+                 use_processes: bool = False):
         """
         Инициализация сканера папок
         
         Args:
             vulnerability_tree: Дерево уязвимостей
             max_workers: Максимальное количество потоков для параллельной обработки
+            use_processes: Сканировать большие папки в пуле процессов вместо потоков
         """
         self.tree = vulnerability_tree
         self.max_workers = max_workers
+        self.use_processes = use_processes
         self.file_scanner = FileScanner(vulnerability_tree)
     
     def get_files_recursive(self, root_path: str, extensions: Optional[List[str]] = None,
@@ -49,20 +64,20 @@ class FolderScanner:
         
         files = []
         exclude_patterns = exclude_patterns or ['.git', '__pycache__', '.venv', 'node_modules']
+        # Проверки собраны заранее: одна регулярка на все паттерны исключения
+        # и один вызов endswith с кортежем расширений вместо цикла по ним
+        is_excluded = re.compile('|'.join(map(re.escape, exclude_patterns))).search
+        suffixes = tuple(extensions) if extensions else None
         
         for root, dirs, filenames in os.walk(root_path):
             # Исключи папки
-            dirs[:] = [d for d in dirs if not any(exc in d for exc in exclude_patterns)]
+            dirs[:] = [d for d in dirs if not is_excluded(d)]
             
-            for filename in filenames:
-                file_path = os.path.join(root, filename)
-                
-                # Фильтруй по расширениям
-                if extensions:
-                    if not any(filename.endswith(ext) for ext in extensions):
-                        continue
-                
-                files.append(file_path)
+            # Фильтруй по расширениям
+            if suffixes:
+                filenames = [filename for filename in filenames if filename.endswith(suffixes)]
+            
+            files.extend([os.path.join(root, filename) for filename in filenames])
         
         return files
     
@@ -81,6 +96,10 @@ class FolderScanner:
         """
         # Получи все файлы
         files = self.get_files_recursive(folder_path)
+        # Игнорируемые файлы (безопасные расширения, скрытые) определяются по одному пути:
+        # они отсеиваются сразу и не занимают пул (scan_file всё равно вернул бы для них None)
+        is_safe_to_ignore = self.file_scanner.file_analyzer.is_safe_to_ignore
+        files = [file_path for file_path in files if not is_safe_to_ignore(file_path)]
         
         if not files:
             print(f"Не найдено файлов для сканирования в {folder_path}")
@@ -122,30 +141,57 @@ class FolderScanner:
     
     def _scan_parallel(self, files: List[str], progress_callback: Optional[Callable] = None) -> List[VulnerabilityFinding]:
         """Параллельное сканирование файлов"""
+        if self.use_processes and len(files) >= PROCESS_POOL_MIN_FILES:
+            return self._scan_processes(files, progress_callback)
+        
         findings = []
-        completed = 0
         
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Отправь задачи
-            future_to_file = {executor.submit(self.file_scanner.scan_file, f): f for f in files}
-            
-            # Процессируй результаты по мере их завершения
-            for future in as_completed(future_to_file):
-                file_path = future_to_file[future]
-                try:
-                    result = future.result()
-                    # Добавляй ВСЕ результаты сканирования, включая безопасные файлы
-                    if result:
-                        findings.append(result)
-                except Exception as e:
-                    # Создай запись о файле даже при ошибке
-                    finding = VulnerabilityFinding(file_path=file_path)
+            # Результаты приходят по порядку файлов, без словаря future -> файл и as_completed
+            for i, result in enumerate(executor.map(self._scan_file_safe, files)):
+                # Добавляй ВСЕ результаты сканирования, включая безопасные файлы
+                if result:
+                    findings.append(result)
+                
+                # Обнови прогресс
+                if progress_callback:
+                    progress_callback(i + 1, len(files))
+        
+        return findings
+    
+    def _scan_file_safe(self, file_path: str) -> Optional[VulnerabilityFinding]:
+        """Сканировать файл; при ошибке вернуть запись о файле без ПО"""
+        try:
+            return self.file_scanner.scan_file(file_path)
+        except Exception:
+            return VulnerabilityFinding(file_path=file_path)
+    
+    def _scan_processes(self, files: List[str], progress_callback: Optional[Callable] = None) -> List[VulnerabilityFinding]:
+        """
+        Сканирование файлов в пуле процессов
+        Разбор PE и сопоставление с деревом нагружают CPU и в потоках упираются в GIL;
+        файлы раздаются процессам пачками, дерево передаётся в каждый процесс один раз
+        """
+        findings = []
+        workers = self.max_workers
+        if sys.platform == 'win32':
+            workers = min(workers, WINDOWS_MAX_PROCESS_WORKERS)
+        chunksize = max(1, len(files) // (workers * 4))
+        
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=init_worker_scanner,
+                                 initargs=(self.tree,)) as executor:
+            # Ошибка в файле даёт запись о файле (как при последовательном сканировании)
+            scanned = executor.map(partial(scan_file_in_worker, keep_errors=True), files,
+                                   chunksize=chunksize)
+            for i, finding in enumerate(scanned):
+                # Добавляй ВСЕ результаты сканирования, включая безопасные файлы
+                if finding:
                     findings.append(finding)
                 
                 # Обнови прогресс
-                completed += 1
                 if progress_callback:
-                    progress_callback(completed, len(files))
+                    progress_callback(i + 1, len(files))
         
         return findings
     
@@ -4,11 +4,13 @@
 """
 
 import sys
-from typing import List, Dict, Optional, Callable
+from typing import List, Dict, Iterator, Optional, Callable
 from pathlib import Path
 
+from ..core.data_structures import SeverityLevel
+
 if sys.platform == 'win32':
-    from ..detectors.software_detector import get_installed_software_from_registry
+    from ..detectors.software_detector import get_installed_software_from_registry, invalidate_registry_cache
 
 
 class RegistrySoftwareInfo:
@@ -51,6 +53,8 @@ class RegistryScanner:
             return []
         
         try:
+            # Явный запрос списка ПО - перечитай реестр, а не бери кэш прошлого сканирования
+            invalidate_registry_cache()
             registry_data = get_installed_software_from_registry()
             
             software_list = []
@@ -84,11 +88,28 @@ class RegistryScanner:
         Returns:
             Список результатов сканирования
         """
+        return list(self.iter_scan_registry(progress_callback))
+    
+    def iter_scan_registry(self, progress_callback: Optional[Callable] = None) -> Iterator[Dict]:
+        """
+        Сканировать установленное ПО из реестра, выдавая результаты по одному
+        Позволяет обрабатывать результаты без накопления всего списка в памяти
+        
+        Args:
+            progress_callback: Функция для отображения прогресса (current, total)
+            
+        Yields:
+            Результат сканирования одной программы (тот же словарь, что и в scan_registry)
+        """
         if not self.installed_software:
             self.get_installed_software()
         
-        results = []
         total = len(self.installed_software)
+        # Члены перечисления сравниваются по идентичности (is), без обращения к .value
+        critical_level = SeverityLevel.CRITICAL
+        high_level = SeverityLevel.HIGH
+        medium_level = SeverityLevel.MEDIUM
+        low_level = SeverityLevel.LOW
         
         for idx, software in enumerate(self.installed_software):
             # Обновить прогресс
@@ -101,44 +122,61 @@ class RegistryScanner:
                 software.version
             )
             
-            result = {
+            # Уровни опасности подсчитываются за один проход
+            vulnerability_count = len(vulnerabilities)
+            critical_count = high_count = medium_count = low_count = 0
+            for vuln in vulnerabilities:
+                severity = vuln.severity
+                if severity is critical_level:
+                    critical_count += 1
+                elif severity is high_level:
+                    high_count += 1
+                elif severity is medium_level:
+                    medium_count += 1
+                elif severity is low_level:
+                    low_count += 1
+            
+            yield {
                 'software_name': software.name,
                 'software_version': software.version,
                 'install_path': software.install_path,
                 'vulnerabilities': vulnerabilities,
-                'has_vulnerabilities': len(vulnerabilities) > 0,
-                'vulnerability_count': len(vulnerabilities),
-                'critical_count': len([v for v in vulnerabilities if v.severity.value == 'critical']),
-                'high_count': len([v for v in vulnerabilities if v.severity.value == 'high']),
-                'medium_count': len([v for v in vulnerabilities if v.severity.value == 'medium']),
-                'low_count': len([v for v in vulnerabilities if v.severity.value == 'low']),
+                'has_vulnerabilities': vulnerability_count > 0,
+                'vulnerability_count': vulnerability_count,
+                'critical_count': critical_count,
+                'high_count': high_count,
+                'medium_count': medium_count,
+                'low_count': low_count,
             }
-            
-            results.append(result)
         
         if progress_callback:
             progress_callback(total, total)
-        
-        return results
     
     def get_statistics(self, scan_results: List[Dict]) -> Dict:
         """
         Получить статистику сканирования
         
         Args:
-            scan_results: Результаты сканирования
+            scan_results: Результаты сканирования (список или итератор
+                из iter_scan_registry - проход по ним выполняется один раз)
             
         Returns:
             Словарь со статистикой
         """
-        total_software = len(scan_results)
-        software_with_vulns = len([r for r in scan_results if r['has_vulnerabilities']])
+        # Все счётчики накапливаются за один проход по результатам
+        total_software = 0
+        software_with_vulns = total_vulns = 0
+        critical = high = medium = low = 0
         
-        total_vulns = sum(r['vulnerability_count'] for r in scan_results)
-        critical = sum(r['critical_count'] for r in scan_results)
-        high = sum(r['high_count'] for r in scan_results)
-        medium = sum(r['medium_count'] for r in scan_results)
-        low = sum(r['low_count'] for r in scan_results)
+        for r in scan_results:
+            total_software += 1
+            if r['has_vulnerabilities']:
+                software_with_vulns += 1
+            total_vulns += r['vulnerability_count']
+            critical += r['critical_count']
+            high += r['high_count']
+            medium += r['medium_count']
+            low += r['low_count']
         
         return {
             'total_software': total_software,